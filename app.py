@@ -1,50 +1,52 @@
 import sys
 import csv
-import psycopg2
+import logging
 import pandas
-import os
-import requests
 import sqlite3
+import psycopg2
+import pricing
+import count_list
+import resources
+import search
+import staff_table
+import db
+import edits
+import offline_db
+import queries
+import workers
 
 # import PyQt5 and related classes
 from PyQt5.QtWidgets import QApplication, QLabel, QPushButton, QLineEdit, QSlider, QGridLayout, QScrollArea, QComboBox,\
-    QWidget, QFrame, QHBoxLayout, QVBoxLayout, QFormLayout, QDialog, QFileDialog, QPlainTextEdit, QTableWidget,\
-    QTableWidgetItem, QCheckBox
+    QWidget, QFrame, QHBoxLayout, QVBoxLayout, QFormLayout, QDialog, QFileDialog, QPlainTextEdit, QTableView,\
+    QCheckBox, QMessageBox
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon, QFont
-
-def resource_path(relative_path):
-    """Get the absolute path to the resource, whether in a bundle or from the filesystem."""
-    try:
-        # PyInstaller sets _MEIPASS to a temporary folder when running from an executable
-        base_path = sys._MEIPASS
-    except Exception:
-        # If running in normal Python environment, use the current directory
-        base_path = os.path.abspath(".")
-    
-    return os.path.join(base_path, relative_path)
-
-def is_online():
-    try:
-        response = requests.get('http://www.example.com', timeout=3)
-        if response.status_code == 200:
-            return True
-        else:
-            return False
-    except requests.exceptions.RequestException:
-        return False
+from PyQt5.QtCore import Qt, QThreadPool, QTimer, QSocketNotifier
 
 def get_db_connection(is_online):
     if is_online:
-        conn = psycopg2.connect(DB_URL)
+        conn = online_pool.connect()
     else:
-        conn = sqlite3.connect("offline.db")
+        conn = offline_db.connect()
 
     return conn
 
 DB_URL = "PW"
 ADMIN_PW = "PW"
+# columns sync_db copies into offline.db, in the order of the local tables
+SYNCED_TABLES = {
+    'items': ('id', 'item_name', 'hidden_value', 'item_tab'),
+    'formulas': ('id', 'formula_name', 'formula_numbers'),
+    'supplies': ('id', 'supply_name', 'supplier', 'order_price', 'resell_price'),
+    'rooms': ('id', 'room_name', 'small_box_quantity', 'medium_box_quantity', 'large_box_quantity',
+              'paper_roll_quantity', 'tape_roll_quantity', 'labor_hours'),
+}
+# item tabs of the moving page, in the order their buttons are shown; packing rooms are listed on their own tab
+MOVING_TABS = ('Kitchen', 'Bedroom', 'Living Room', 'Outside', 'Office', 'Boxes')
+# notifications on this channel name the catalog table another client just wrote to,
+# see scripts/add_change_notifications.py
+CATALOG_CHANNEL = 'catalog_changes'
+# every online query goes through this pool, so connections are reused instead of reopened per click
+online_pool = db.ConnectionPool(DB_URL)
 
 # STYLESHEETS
 main_layout_stylesheet = """
@@ -56,15 +58,74 @@ main_layout_stylesheet = """
         border: 2px solid rgb(128, 179, 255);
         border-radius: 5px;
         padding: 2px 5px;
+        font-family: Times;
+        font-size: 9pt;
     }
     QPushButton::hover {
         background-color: rgb(128, 179, 255);
     }
+    QPushButton[current="true"] {
+        color: rgb(179, 89, 0);
+    }
+    QLabel, QLineEdit, QComboBox {
+        font-family: Times;
+        font-size: 10pt;
+    }
+    QFrame#details_frame QLabel {
+        font-size: 9pt;
+    }
     QScrollArea {
         border: 2px solid rgb(128, 179, 255);
         border-radius: 5px;
         background-color: rgb(230, 235, 240);
     }
+    QListView#count_list {
+        border: 2px solid rgb(128, 179, 255);
+        border-radius: 5px;
+        background-color: rgb(225, 235, 240);
+    }
+"""
+# every edit dialog and the sync notice; supply and room dialogs are named wide_dialog
+dialog_stylesheet = """
+    QDialog {
+        background-color: rgb(225, 235, 240);
+    }
+    QDialog#wide_dialog {
+        min-width: 400px;
+    }
+    QPushButton {
+        background-color: rgb(165, 209, 255);
+        border: 2px solid rgb(128, 179, 255);
+        border-radius: 5px;
+        padding: 2px 5px;
+    }
+    QPushButton::hover {
+        background-color: rgb(128, 179, 255);
+    }
+    QLineEdit {
+        border: 1px solid rgb(128, 179, 255);
+        border-radius: 3px;
+        background-color: rgb(250, 250, 250);
+        padding: 2px 2px;
+    }
+    QComboBox {
+        border: 1px solid rgb(128, 179, 255);
+        border-radius: 3px;
+        background-color: rgb(250, 250, 250);
+        padding: 2px 2px;
+    }
+    QComboBox::drop-down {
+        background-color: rgb(250, 250, 250);
+        border-radius: 3px;
+    }
+    QComboBox::down-arrow {
+        image: url(icons/arrow.png);
+        width: 8px;
+        height: 8px;
+    }
+    QComboBox QAbstractItemView {
+        background-color: rgb(250, 250, 250);
+    }
 """
 widget_stylesheet = """
     border: 0px;
@@ -160,7 +221,8 @@ def convert_integer_or_leave_float(num):
 
 class UI(QWidget):
     def __init__(self):
-        self.is_online = is_online()
+        # app opens on the local cache and switches to online mode once the database answers the probe below
+        self.is_online = False
         self.moving_calculation_details_opened = False
         self.packing_calculation_details_opened = False
         self.client_name = ""
@@ -168,7 +230,7 @@ class UI(QWidget):
 
         # main layout settings
         super(UI, self).__init__()
-        self.setWindowIcon(QIcon(resource_path("icons/moving-truck.png")))
+        self.setWindowIcon(resources.icon("moving-truck.png"))
         self.setWindowTitle("Flint Hills Moving - Pricing Calculator")
 
         self.moving_layout = QGridLayout()
@@ -303,66 +365,45 @@ class UI(QWidget):
         self.boxes_tab = QPushButton()
         self.boxes_tab.clicked.connect(self.get_boxes_tab)
         self.boxes_tab.setText("Boxes")
-        # UI scroll area and scroll bars
-        self.kitchen_scroll_area = QScrollArea()
-        self.kitchen_widget = QWidget()
-        self.kitchen_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.kitchen_scroll_area, self.kitchen_widget, self.kitchen_widget_layout)
-        self.bedroom_scroll_area = QScrollArea()
-        self.bedroom_widget = QWidget()
-        self.bedroom_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.bedroom_scroll_area, self.bedroom_widget, self.bedroom_widget_layout)
-        self.living_scroll_area = QScrollArea()
-        self.living_widget = QWidget()
-        self.living_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.living_scroll_area, self.living_widget, self.living_widget_layout)
-        self.outside_scroll_area = QScrollArea()
-        self.outside_widget = QWidget()
-        self.outside_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.outside_scroll_area, self.outside_widget, self.outside_widget_layout)
-        self.office_scroll_area = QScrollArea()
-        self.office_widget = QWidget()
-        self.office_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.office_scroll_area, self.office_widget, self.office_widget_layout)
-        self.boxes_scroll_area = QScrollArea()
-        self.boxes_widget = QWidget()
-        self.boxes_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.boxes_scroll_area, self.boxes_widget, self.boxes_widget_layout)
-        self.packing_scroll_area = QScrollArea()
-        self.packing_widget = QWidget()
-        self.packing_widget_layout = QFormLayout()
-        self.set_scroll_area_settings(self.packing_scroll_area, self.packing_widget, self.packing_widget_layout)
-        # all tabs as dictionary
+        # item and room lists: a model holding names and counts per tab, drawn by one shared delegate
+        self.count_delegate = count_list.CountDelegate(resources.icon("minus.png"),
+                                                       resources.icon("plus.png"), resources.font(10),
+                                                       self.integer_only, self)
+        self.count_models = {tab: count_list.CountListModel(parent=self) for tab in MOVING_TABS + ('Packing',)}
+        for tab in MOVING_TABS:
+            self.count_models[tab].count_changed.connect(self.change_item_count)
+        self.packing_list = self.create_count_list('Packing')
+        # all tabs as dictionary; a tab's list view is only built the first time the tab is shown
         self.ALL_TABS = {
             "kitchen": {
                 "tab": self.kitchen_tab,
-                "scroll_area": self.kitchen_scroll_area,
-                "widget": self.kitchen_widget
+                "items": 'Kitchen',
+                "view": None
             },
             "bedroom": {
                 "tab": self.bedroom_tab,
-                "scroll_area": self.bedroom_scroll_area,
-                "widget": self.bedroom_widget
+                "items": 'Bedroom',
+                "view": None
             },
             "living": {
                 "tab": self.living_tab,
-                "scroll_area": self.living_scroll_area,
-                "widget": self.living_widget
+                "items": 'Living Room',
+                "view": None
             },
             "outside": {
                 "tab": self.outside_tab,
-                "scroll_area": self.outside_scroll_area,
-                "widget": self.outside_widget
+                "items": 'Outside',
+                "view": None
             },
             "office": {
                 "tab": self.office_tab,
-                "scroll_area": self.office_scroll_area,
-                "widget": self.office_widget
+                "items": 'Office',
+                "view": None
             },
             "boxes": {
                 "tab": self.boxes_tab,
-                "scroll_area": self.boxes_scroll_area,
-                "widget": self.boxes_widget
+                "items": 'Boxes',
+                "view": None
             },
         }
         # Buttons and other settings
@@ -425,6 +466,8 @@ class UI(QWidget):
         self.slider.setMinimumWidth(260)
         self.slider_layout.addWidget(self.slider, alignment=Qt.AlignBottom)
         self.slider_layout.addWidget(self.slider_label, alignment=Qt.AlignCenter | Qt.AlignTop)
+        self.live_estimate_label = QLabel()
+        self.slider_layout.addWidget(self.live_estimate_label, alignment=Qt.AlignCenter | Qt.AlignTop)
         self.calculate_estimate_button = QPushButton()
         self.calculate_estimate_button.clicked.connect(self.calculate_estimate)
         self.calculate_estimate_button.setText("Calculate")
@@ -461,6 +504,7 @@ class UI(QWidget):
                                               "QPushButton::hover {background-color: rgb(255, 128, 0);}")
         self.export_list_button.hide()
         self.details_frame = QFrame()
+        self.details_frame.setObjectName("details_frame")
         self.details_layout = QFormLayout()
         self.details_frame.setLayout(self.details_layout)
         self.details_frame.setStyleSheet("""
@@ -516,16 +560,9 @@ class UI(QWidget):
         self.staff_wrong_secret_key_label = QLabel()
         self.staff_wrong_secret_key_label.setText("")
         self.staff_wrong_secret_key_label.setFixedWidth(200)
-        self.staff_table_widget = QTableWidget()
-        self.staff_table_widget.setRowCount(6)
-        self.staff_table_widget.setColumnCount(5)
-        self.staff_table_widget.setHorizontalHeaderLabels(['', 'Quantity', 'Supply Cost', 'Resell Price', 'Profit'])
-        self.staff_table_widget.setItem(0, 0, QTableWidgetItem("  Small Boxes"))
-        self.staff_table_widget.setItem(1, 0, QTableWidgetItem("  Medium Boxes"))
-        self.staff_table_widget.setItem(2, 0, QTableWidgetItem("  Large Boxes"))
-        self.staff_table_widget.setItem(3, 0, QTableWidgetItem("  Paper Rolls"))
-        self.staff_table_widget.setItem(4, 0, QTableWidgetItem("  Tape Rolls"))
-        self.staff_table_widget.setItem(5, 0, QTableWidgetItem("  Total"))
+        self.staff_table_model = staff_table.StaffCostModel()
+        self.staff_table_widget = QTableView()
+        self.staff_table_widget.setModel(self.staff_table_model)
         self.staff_table_widget.setColumnWidth(0, 127)
         self.staff_table_widget.setColumnWidth(1, 90)
         self.staff_table_widget.setColumnWidth(2, 90)
@@ -540,14 +577,14 @@ class UI(QWidget):
         # table settings
         self.staff_table_widget.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.staff_table_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.staff_table_widget.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.staff_table_widget.setEditTriggers(QTableView.NoEditTriggers)
         self.staff_table_widget.verticalHeader().setVisible(False)
-        self.staff_table_widget.setSelectionBehavior(QTableWidget.SelectItems)
-        self.staff_table_widget.setSelectionMode(QTableWidget.NoSelection)
+        self.staff_table_widget.setSelectionBehavior(QTableView.SelectItems)
+        self.staff_table_widget.setSelectionMode(QTableView.NoSelection)
         self.staff_table_widget.setFixedWidth(500)
         self.staff_table_widget.setMinimumHeight(327)
         self.staff_table_widget.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 2px solid rgb(128, 179, 255);
                 border-radius: 5px;
                 margin-right: 10px;
@@ -662,12 +699,65 @@ class UI(QWidget):
         self.is_online_label = QLabel()
         self.is_online_label.setText("Online Mode" if self.is_online else "Offline Mode")
         self.is_online_label.setStyleSheet("font-size: 10px; color: 'blue'")
+        self.busy_label = QLabel()
+        self.busy_label.setText("Loading...")
+        self.busy_label.setStyleSheet("font-size: 10px; color: 'blue'")
+        self.busy_label.hide()
+        # search over item and room names, shown on every page
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search items and rooms")
+        self.search_input.setStyleSheet("border: 1px solid rgb(128, 179, 255);"
+                                        "border-radius: 3px;"
+                                        "background-color: rgb(250, 250, 250);")
+        self.search_input.setFixedWidth(200)
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.search_catalog)
+        self.search_input.returnPressed.connect(self.open_search_match)
+        self.cancel_task_button = QPushButton()
+        self.cancel_task_button.setText("Cancel")
+        self.cancel_task_button.setStyleSheet("border: 1px solid rgb(128, 179, 255);"
+                                              "border-radius: 3px;"
+                                              "padding: 1px 5px;")
+        self.cancel_task_button.clicked.connect(self.cancel_tasks)
+        self.cancel_task_button.hide()
+        # database work gets its own thread pool: Qt uses the global one for image conversion and would wait on a
+        # blocked query there while holding the GIL. Tasks stay in self.tasks until their results are delivered
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.tasks = []
+        self.pricing_task = None
+        self.pricing_error = None
+        # (edit, on_saved) pairs not written yet; the first one is being written, the others wait for it so the
+        # database sees edits in the order they were made
+        self.unsaved_edits = []
+        # set when the server refused one of them; the catalog is read again once the others are written
+        self.edits_refused = False
+        # catalog change notifications: the listening connection, its socket notifier and the tables changed since the
+        # last delta sync, which waits a moment so a burst of edits is pulled in one go
+        self.listen_conn = None
+        self.listen_notifier = None
+        # milliseconds before listening is tried again after it failed, doubled on each failure in a row
+        self.listen_retry_delay = 5000
+        self.changed_tables = set()
+        self.changes_timer = QTimer(self)
+        self.changes_timer.setSingleShot(True)
+        self.changes_timer.setInterval(500)
+        self.changes_timer.timeout.connect(self.sync_changed_tables)
+        # while offline the database is probed again every so often, so the app goes back online mid-session; those
+        # probes don't show the busy indicator, an offline session would otherwise keep flashing it
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setSingleShot(True)
+        self.probe_timer.setInterval(30000)
+        self.probe_timer.timeout.connect(lambda: self.probe_database(quiet=True))
 
         # we place defined UI elements to the GUI below
+        self.main_layout.addWidget(self.search_input, 0, 1, 1, 2, alignment=Qt.AlignLeft)
         self.main_layout.addWidget(self.moving_tab, 0, 3, 1, 1)
         self.main_layout.addWidget(self.packing_tab, 0, 4, 1, 1)
         self.main_layout.addWidget(self.summary_tab, 0, 5, 1, 1)
         self.main_layout.addWidget(self.staff_tab, 0, 6, 1, 1)
+        self.main_layout.addWidget(self.busy_label, 0, 7, 1, 1, alignment=Qt.AlignRight)
+        self.main_layout.addWidget(self.cancel_task_button, 0, 8, 1, 1, alignment=Qt.AlignCenter)
         self.main_layout.addWidget(self.is_online_label, 0, 9, 1, 1, alignment=Qt.AlignCenter)
         self.main_layout.setRowMinimumHeight(0, 10)
         self.main_layout.setColumnMinimumWidth(0, 30)
@@ -687,12 +777,6 @@ class UI(QWidget):
         self.moving_layout.addWidget(self.outside_tab, 2, 4, 1, 1)
         self.moving_layout.addWidget(self.office_tab, 2, 5, 1, 1)
         self.moving_layout.addWidget(self.boxes_tab, 2, 6, 1, 1)
-        self.moving_layout.addWidget(self.kitchen_scroll_area, 3, 1, 20, 6)
-        self.moving_layout.addWidget(self.bedroom_scroll_area, 3, 1, 20, 6)
-        self.moving_layout.addWidget(self.living_scroll_area, 3, 1, 20, 6)
-        self.moving_layout.addWidget(self.outside_scroll_area, 3, 1, 20, 6)
-        self.moving_layout.addWidget(self.office_scroll_area, 3, 1, 20, 6)
-        self.moving_layout.addWidget(self.boxes_scroll_area, 3, 1, 20, 6)
         self.moving_layout.addWidget(self.clear_selections_button, 23, 6, 1, 1, alignment=Qt.AlignRight)
         self.moving_layout.addWidget(self.import_button, 23, 1, 1, 1)
         self.moving_layout.addWidget(self.round_trip_distance_label, 3, 8, 1, 2)
@@ -715,7 +799,7 @@ class UI(QWidget):
         self.packing_layout.setRowMinimumHeight(0, 10)
         self.packing_layout.setColumnMinimumWidth(0, 30)
         self.packing_layout.setRowMinimumHeight(24, 10)
-        self.packing_layout.addWidget(self.packing_scroll_area, 3, 1, 20, 6)
+        self.packing_layout.addWidget(self.packing_list, 3, 1, 20, 6)
         self.packing_layout.addWidget(self.packs_slider_frame, 4, 7, 2, 3, alignment=Qt.AlignCenter)
         self.packing_layout.addWidget(self.packs_costs_frame, 8, 7, 5, 3, alignment=Qt.AlignCenter)
         self.packing_layout.addWidget(self.calculate_packing_cost_button, 6, 7, 1, 3, alignment=Qt.AlignCenter)
@@ -747,14 +831,6 @@ class UI(QWidget):
         self.summary_layout.addWidget(self.summary_packing_rooms_frame_scroll_area, 2, 2, 1, 1, alignment=Qt.AlignLeft)
 
         # we set initial properties below
-        self.i_kitchen = 0
-        self.i_bedroom = 0
-        self.i_living = 0
-        self.i_outside = 0
-        self.i_office = 0
-        self.i_boxes = 0
-        self.i_total = 0
-        self.i_room = 0
         self.import_note = ''
 
         # initial moving and packing costs
@@ -764,161 +840,84 @@ class UI(QWidget):
         self.is_packing_calculated = False
         self.room_names_and_counts = []
 
-        # set font size below
-        for label in self.findChildren(QLabel):
-            label.setFont(QFont('Times', 10))
-        for lineedit in self.findChildren(QLineEdit):
-            lineedit.setFont(QFont('Times', 10))
-        for button in self.findChildren(QPushButton):
-            button.setFont(QFont('Times', 9))
-        for combobox in self.findChildren(QComboBox):
-            combobox.setFont(QFont('Times', 10))
-        for item in self.details_frame.findChildren(QLabel):
-            item.setFont(QFont('Times', 9))
+        # fonts of this window come from main_layout_stylesheet
 
         # pull info from database and put into app below
         conn = get_db_connection(self.is_online)
-        cursor = conn.cursor()
         try:
-            cursor.execute('''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name ASC''')
             # item list will hold all data of items inside a list
-            self.all_items = cursor.fetchall()
+            self.all_items = queries.fetch_all(conn, 'items')
         except sqlite3.OperationalError:
             self.all_items = []
             self.main_estimate_label.setText("Error: You have to go online and sync data to use the app")
-        self.formula_numbers = []
+        self.catalog = pricing.Catalog(self.all_items)
+        self.formulas = None
+        self.packing = None
+        self.running_estimate = None
+        # results of calculate_estimate and calculate_packing_cost (also used by import_list), keyed by quote
+        self.quote_cache = pricing.QuoteCache()
+        # estimate label follows every count and input change without pressing Calculate
+        self.round_trip_distance.textChanged.connect(self.update_live_estimate)
+        self.estimator_adjustment.textChanged.connect(self.update_live_estimate)
+        self.ft_riley_adjustment.currentTextChanged.connect(self.update_live_estimate)
+        self.slider.valueChanged.connect(self.update_live_estimate)
+        self.reload_pricing_data()
         ###
-        for item in self.all_items:
-            if item[2] == 'Kitchen':
-                self.add_row(self.kitchen_widget_layout, item[0], item[2])
-            elif item[2] == 'Bedroom':
-                self.add_row(self.bedroom_widget_layout, item[0], item[2])
-            elif item[2] == 'Living Room':
-                self.add_row(self.living_widget_layout, item[0], item[2])
-            elif item[2] == 'Outside':
-                self.add_row(self.outside_widget_layout, item[0], item[2])
-            elif item[2] == 'Office':
-                self.add_row(self.office_widget_layout, item[0], item[2])
-            elif item[2] == 'Boxes':
-                self.add_row(self.boxes_widget_layout, item[0], item[2])
+        for tab in MOVING_TABS:
+            self.count_models[tab].reset([item[0] for item in self.all_items if item[2] == tab])
         ###
         self.all_supplies = []
         try:
-            cursor.execute("""SELECT * FROM rooms ORDER BY room_name ASC""")
-            self.all_rooms = cursor.fetchall()
+            self.all_rooms = queries.fetch_all(conn, 'rooms_by_name')
         except sqlite3.OperationalError:
             self.all_rooms = []
-        for item in self.all_rooms:
-            self.add_row(self.packing_widget_layout, item[1], "Packing")
-            self.i_room += 1
+        self.count_models['Packing'].reset([item[1] for item in self.all_rooms])
         conn.close()
-
-        # adjust minimum scrollable area width below
-        try:
-            row_button_width = self.outside_scroll_area.findChild(QPushButton).width()
-            row_line_edit_width = self.outside_scroll_area.findChild(QLineEdit).width()
-        except AttributeError:
-            row_button_width = 50
-            row_line_edit_width = 200
-        label_width = [10]
-        for label in self.kitchen_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.bedroom_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.living_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.boxes_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.office_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.outside_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        for label in self.packing_scroll_area.findChildren(QLabel):
-            label.adjustSize()
-            label_width.append(label.width())
-        ###
-        try:
-            row_height = self.outside_scroll_area.findChild(QFrame).height() * 10
-        except AttributeError:
-            row_height = 400
-        min_scroll_width = max(label_width) + row_button_width + row_button_width + row_line_edit_width + 20
-        self.kitchen_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.bedroom_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.living_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.boxes_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.office_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.outside_scroll_area.setMinimumSize(min_scroll_width, row_height)
-        self.packing_scroll_area.setMinimumSize(400, 300)
+        # words of every row name, kept in step with the rows by apply_row_changes
+        self.name_index = search.NameIndex([(name, tab) for tab, model in self.count_models.items()
+                                            for name in model.names])
+        self.search_matches = None
+        # names hidden by the search in each list, as of the last time that list was filtered
+        self.hidden_rows = {}
+
+        # adjust minimum list width below, measured from the names instead of laid out labels
+        min_list_width = self.count_delegate.width_for(
+            [name for tab in MOVING_TABS for name in self.count_models[tab].names]) + 20
+        self.list_minimum_size = (min_list_width, self.count_delegate.row_height * 10)
+        self.packing_list.setMinimumSize(400, 300)
 
         # open app with these settings:
         self.get_kitchen_tab()
-        self.moving_tab.setStyleSheet("color: rgb(179, 89, 0);")
         self.show_and_hide_layout(self.moving_layout)
         # set initial size of the main window
         width = self.width()
         self.resize(800, width)
 
         self.db_synced_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.db_synced_window.setWindowIcon(QIcon(resource_path("icons/diamond.png")))
+        self.db_synced_window.setWindowIcon(resources.icon("diamond.png"))
         db_synced_layout = QGridLayout()
         self.db_synced_window.setLayout(db_synced_layout)
         self.db_synced_window.setWindowTitle("Successfully synced")
-        self.db_synced_window.setStyleSheet("QDialog {"
-            "background-color: rgb(225, 235, 240);}"
-            "QPushButton {"
-            "background-color: rgb(165, 209, 255);"
-            "border: 2px solid rgb(128, 179, 255);"
-            "border-radius: 5px;"
-            "padding: 2px 5px;}"
-            "QPushButton::hover {"
-            "background-color: rgb(128, 179, 255);}"
-            "QLineEdit {"
-            "border: 1px solid rgb(128, 179, 255);"
-            "border-radius: 3px;"
-            "background-color: rgb(250, 250, 250);"
-            "padding: 2px 2px;}"
-            "QComboBox {border: 1px solid rgb(128, 179, 255);"
-            "border-radius: 3px;"
-            "background-color: rgb(250, 250, 250);"
-            "padding: 2px 2px;}"
-            "QComboBox::drop-down {"
-            "background-color: rgb(250, 250, 250);"
-            "border-radius: 3px;}"
-            "QComboBox::down-arrow {"
-            "image: url(icons/arrow.png);"
-            "width: 8px;"
-            "height: 8px;}"
-            "QComboBox QAbstractItemView {"
-            "background-color: rgb(250, 250, 250);}")
+        self.db_synced_window.setStyleSheet(dialog_stylesheet)
         self.db_synced_label_1 = QLabel()
         self.db_synced_label_1.setText("You have the latest data on your app.")
-        self.db_synced_label_1.setFont(QFont('Times', 10))
+        self.db_synced_label_1.setFont(resources.font(10))
         self.db_synced_label_2 = QLabel()
         self.db_synced_label_2.setText("When you open the app without internet next time,")
-        self.db_synced_label_2.setFont(QFont('Times', 10))
+        self.db_synced_label_2.setFont(resources.font(10))
         self.db_synced_label_3 = QLabel()
         self.db_synced_label_3.setText("you'll be able to use the app offline.")
-        self.db_synced_label_3.setFont(QFont('Times', 10))
+        self.db_synced_label_3.setFont(resources.font(10))
         db_synced_layout.addWidget(self.db_synced_label_1)
         db_synced_layout.addWidget(self.db_synced_label_2)
         db_synced_layout.addWidget(self.db_synced_label_3)
 
-        if not self.is_online:
-            self.sync_db_button.setDisabled(True)
-            self.edit_items_button.setDisabled(True)
-            self.edit_formulas_button.setDisabled(True)
-            self.edit_value_multiplier_button.setDisabled(True)
-            self.edit_supplies_button.setDisabled(True)
-            self.edit_room_materials_button.setDisabled(True)
+        # edit buttons work offline too, only syncing needs the database
+        self.sync_db_button.setEnabled(self.is_online)
+        self.probe_database()
 
         ### load selected items from previous session
-        sqlite_conn = sqlite3.connect("offline.db")
+        sqlite_conn = offline_db.connect()
         sqlite_cursor = sqlite_conn.cursor()
         try:
             sqlite_cursor.execute('''SELECT name, type, item_tab, count FROM selected_items''')
@@ -927,32 +926,23 @@ class UI(QWidget):
             selected_items = []
         sqlite_conn.close()
 
-        # Create a dictionary to map item_tabs to their corresponding scroll areas
-        scroll_areas = {
-            "kitchen": self.kitchen_scroll_area,
-            "bedroom": self.bedroom_scroll_area,
-            "living": self.living_scroll_area,
-            "outside": self.outside_scroll_area,
-            "office": self.office_scroll_area,
-            "boxes": self.boxes_scroll_area,
-            "pack": self.packing_scroll_area
+        # item_tab of the saved rows, mapped to the tab they are shown in
+        saved_tabs = {
+            "kitchen": 'Kitchen',
+            "bedroom": 'Bedroom',
+            "living": 'Living Room',
+            "outside": 'Outside',
+            "office": 'Office',
+            "boxes": 'Boxes',
         }
 
         # Loop through the selected items
         for it in selected_items:
             if it[1] == "move":
-                # If the item_tab is found in the scroll_areas dictionary
-                if it[2] in scroll_areas:
-                    scroll_area = scroll_areas[it[2]]  # Get the corresponding scroll area
-                    for x in scroll_area.findChildren(QLabel):
-                        if it[0] == x.text():
-                            x.parent().findChildren(QLineEdit)[0].setText(str(it[3]))
+                if it[2] in saved_tabs:
+                    self.count_models[saved_tabs[it[2]]].set_count(it[0], it[3])
             elif it[1] == "pack":
-                # Handle the packing type case using the same dictionary
-                scroll_area = scroll_areas["pack"]
-                for x in scroll_area.findChildren(QLabel):
-                    if it[0] == x.text():
-                        x.parent().findChildren(QLineEdit)[0].setText(str(it[3]))
+                self.count_models['Packing'].set_count(it[0], it[3])
             elif it[1] == "client":
                 self.client_name = it[0]
                 self.client_name_input.setText(self.client_name)
@@ -984,11 +974,10 @@ class UI(QWidget):
                 self.show_layout(item)
             else:
                 self.hide_layout(item)
+        for button, item in [(self.moving_tab, self.moving_layout), (self.packing_tab, self.packing_layout),
+                             (self.summary_tab, self.summary_layout), (self.staff_tab, self.staff_layout)]:
+            self.highlight_tab(button, layout == item)
         if layout == self.moving_layout:
-            self.moving_tab.setStyleSheet("color: rgb(179, 89, 0);")
-            self.packing_tab.setStyleSheet("color: black;")
-            self.summary_tab.setStyleSheet("color: black;")
-            self.staff_tab.setStyleSheet("color: black;")
             if not self.is_moving_calculated and not self.moving_calculation_details_opened:
                 self.see_details_button.hide()
                 self.export_list_button.hide()
@@ -998,20 +987,8 @@ class UI(QWidget):
         elif layout == self.packing_layout:
             if not self.is_packing_calculated:
                 self.packs_see_details_button.hide()
-            self.packing_tab.setStyleSheet("color: rgb(179, 89, 0);")
-            self.moving_tab.setStyleSheet("color: black;")
-            self.summary_tab.setStyleSheet("color: black;")
-            self.staff_tab.setStyleSheet("color: black;")
-        elif layout == self.summary_layout:
-            self.summary_tab.setStyleSheet("color: rgb(179, 89, 0);")
-            self.staff_tab.setStyleSheet("color: black;")
-            self.packing_tab.setStyleSheet("color: black;")
-            self.moving_tab.setStyleSheet("color: black;")
+            self.filter_count_list(self.packing_list, 'Packing')
         elif layout == self.staff_layout:
-            self.summary_tab.setStyleSheet("color: black;")
-            self.staff_tab.setStyleSheet("color: rgb(179, 89, 0);")
-            self.packing_tab.setStyleSheet("color: black;")
-            self.moving_tab.setStyleSheet("color: black;")
             self.staff_secret_key_line.setText("")
             self.staff_wrong_secret_key_label.setText("")
             self.staff_table_widget.hide()
@@ -1023,6 +1000,19 @@ class UI(QWidget):
             self.edit_room_materials_button.hide()
             self.sync_db_button.hide()
 
+    @staticmethod
+    def highlight_tab(button, is_current):
+        # the color comes from the QPushButton[current="true"] rule, re-polishing applies it
+        button.setProperty("current", is_current)
+        button.style().unpolish(button)
+        button.style().polish(button)
+
+    def create_count_list(self, tab):
+        view = count_list.CountListView(self.count_models[tab], self.count_delegate)
+        view.setObjectName("count_list")
+        view.verticalScrollBar().setStyleSheet(scroll_bar_stylesheet)
+        return view
+
     @staticmethod
     def set_scroll_area_settings(scroll_area, widget, widget_layout):
         scroll_area.setWidgetResizable(True)
@@ -1034,13 +1024,19 @@ class UI(QWidget):
         scroll_area.setWidget(widget)
 
     def show_one_tab_and_hide_others(self, new_tab):
+        self.current_tab = new_tab
         for tab_name, tab_info in self.ALL_TABS.items():
             if tab_name == new_tab:
-                tab_info["scroll_area"].show()
-                tab_info["tab"].setStyleSheet("color: rgb(179, 89, 0);")
-            else:
-                tab_info["scroll_area"].hide()
-                tab_info["tab"].setStyleSheet("color: black;")
+                if tab_info["view"] is None:
+                    # counts restored or imported before now are already in the model, the view just shows them
+                    tab_info["view"] = self.create_count_list(tab_info["items"])
+                    tab_info["view"].setMinimumSize(*self.list_minimum_size)
+                    self.moving_layout.addWidget(tab_info["view"], 3, 1, 20, 6)
+                self.filter_count_list(tab_info["view"], tab_info["items"])
+                tab_info["view"].show()
+            elif tab_info["view"] is not None:
+                tab_info["view"].hide()
+            self.highlight_tab(tab_info["tab"], tab_name == new_tab)
 
     def get_kitchen_tab(self):
         self.show_one_tab_and_hide_others("kitchen")
@@ -1086,81 +1082,16 @@ class UI(QWidget):
         else:
             self.packs_slider_label.setText("High Range Value")
 
-    def add_row(self, widget_layout, name, tab):
-        row_frame = QFrame(self)
-        row_frame.setStyleSheet("border: 1px solid rgb(128, 179, 255);"
-                                "border-radius: 3px;")
-        row_layout = QHBoxLayout()
-        row_layout.setSpacing(10)
-        row_frame.setLayout(row_layout)
-        item_name = QLabel(row_frame)
-        item_name.setStyleSheet("border: none;")
-        item_name.setText(f"{name}")
-        minus_button = QPushButton(row_frame)
-        minus_button.setStyleSheet("border: none; margin: 3px;")
-        minus_button.setIcon(QIcon(resource_path(resource_path("icons/minus.png"))))
-        number_of_item = QLineEdit(row_frame)
-        number_of_item.setStyleSheet("background-color: rgb(250, 250, 250);")
-        number_of_item.setValidator(self.integer_only)
-        number_of_item.setText("0")
-        number_of_item.setFixedWidth(40)
-        plus_button = QPushButton(row_frame)
-        plus_button.setStyleSheet("border: none; margin: 3px;")
-        plus_button.setIcon(QIcon(resource_path("icons/plus.png")))
-        #####
-        minus_button.clicked.connect(self.minus_number)
-        plus_button.clicked.connect(self.plus_number)
-
-        # add row elements below
-        row_layout.addWidget(item_name, alignment=Qt.AlignLeft)
-        row_layout.addStretch()
-        row_layout.addWidget(minus_button, alignment=Qt.AlignRight)
-        row_layout.addWidget(number_of_item)
-        row_layout.addWidget(plus_button, alignment=Qt.AlignLeft)
-        widget_layout.addWidget(row_frame)
-        for label in row_frame.findChildren(QLabel):
-            label.setFont(QFont('Times', 10))
-        for lineedit in row_frame.findChildren(QLineEdit):
-            lineedit.setFont(QFont('Times', 10))
-        if tab == 'Kitchen':
-            self.i_kitchen += 1
-        elif tab == 'Bedroom':
-            self.i_bedroom += 1
-        elif tab == 'Living Room':
-            self.i_living += 1
-        elif tab == 'Outside':
-            self.i_outside += 1
-        elif tab == 'Office':
-            self.i_office += 1
-        elif tab == 'Boxes':
-            self.i_boxes += 1
-        if tab != 'Packing':
-            self.i_total += 1
-
-    def minus_number(self):
-        sender = self.sender()
-        parent = sender.parentWidget()
-        line_edit = parent.findChild(QLineEdit)
-        try:
-            number = int(line_edit.text())
-        except ValueError:
-            return
-        if number > 0:
-            number -= 1
-        line_edit.setText(str(number))
-
-    def plus_number(self):
-        sender = self.sender()
-        parent = sender.parentWidget()
-        line_edit = parent.findChild(QLineEdit)
-        try:
-            number = int(line_edit.text())
-        except ValueError:
-            return
-        number += 1
-        line_edit.setText(str(number))
-
     def edit_items(self):
+        self.run_in_background(self.fetch_items, self.show_edit_items)
+
+    def fetch_items(self):
+        conn = get_db_connection(self.is_online)
+        all_items = queries.fetch_all(conn, 'items')
+        conn.close()
+        return all_items
+
+    def show_edit_items(self, all_items):
 
         def change_edited_item():
             name = choose_item_combobox.currentText()
@@ -1188,49 +1119,17 @@ class UI(QWidget):
                         item_tab.setCurrentText(edited_item[2])
 
         self.edit_items_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.edit_items_window.setWindowIcon(QIcon(resource_path("icons/edit.png")))
+        self.edit_items_window.setWindowIcon(resources.icon("edit.png"))
         layout = QGridLayout()
         self.edit_items_window.setLayout(layout)
         self.edit_items_window.setWindowTitle("Edit Moving Items")
-        self.edit_items_window.setStyleSheet("QDialog {"
-                                             "background-color: rgb(225, 235, 240);}"
-                                             "QPushButton {"
-                                             "background-color: rgb(165, 209, 255);"
-                                             "border: 2px solid rgb(128, 179, 255);"
-                                             "border-radius: 5px;"
-                                             "padding: 2px 5px;}"
-                                             "QPushButton::hover {"
-                                             "background-color: rgb(128, 179, 255);}"
-                                             "QLineEdit {"
-                                             "border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox {border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox::drop-down {"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "border-radius: 3px;}"
-                                             "QComboBox::down-arrow {"
-                                             "image: url(icons/arrow.png);"
-                                             "width: 8px;"
-                                             "height: 8px;}"
-                                             "QComboBox QAbstractItemView {"
-                                             "background-color: rgb(250, 250, 250);}")
+        self.edit_items_window.setStyleSheet(dialog_stylesheet)
         edit_items_widget = QWidget(self.edit_items_window)
         layout.addWidget(edit_items_widget)
         edit_items_layout = QGridLayout()
         edit_items_widget.setLayout(edit_items_layout)
-        # get latest info from database below
-        self.all_items.clear()
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = '''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name ASC'''
-        cursor.execute(sql)
-        self.all_items = cursor.fetchall()
-        conn.close()
+        # latest info from database was fetched in the background
+        self.apply_items(all_items)
         # define UI elements below
         choose_item_combobox = QComboBox()
         choose_item_combobox.setPlaceholderText(" ")
@@ -1246,6 +1145,7 @@ class UI(QWidget):
         item_value_label.setText("Item Hidden Value:")
         item_value = QLineEdit()
         item_value.setEnabled(False)
+        item_value.setValidator(self.integer_only)
         item_tab_label = QLabel()
         item_tab_label.setText("Item Tab:")
         item_tab = QComboBox()
@@ -1273,213 +1173,218 @@ class UI(QWidget):
         edit_items_layout.addWidget(save_button, 4, 1, 1, 1)
 
         for item in self.edit_items_window.findChildren(QLabel):
-            item.setFont(QFont('Times', 10))
+            item.setFont(resources.font(10))
         for item in self.edit_items_window.findChildren(QComboBox):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_items_window.findChildren(QLineEdit):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_items_window.findChildren(QPushButton):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         self.edit_items_window.show()
 
     def save_item(self, name, value, tab, where):
         if value == '':
             return
+        # the validator still lets a lone sign through; nothing that isn't a number reaches offline.db or the outbox
+        try:
+            int(value)
+        except ValueError:
+            QMessageBox.warning(self.edit_items_window, "Edit Moving Items", "Item hidden value has to be a number.")
+            return
+        values = {'item_name': name, 'hidden_value': value, 'item_tab': tab}
         if where == "-- Add New Item --":
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            sql = f'''INSERT INTO items (item_name, hidden_value, item_tab) VALUES
-            ('{name}', '{value}', '{tab}')
-            '''
-            cursor.execute(sql)
-            self.all_items = []
-            conn.commit()
-            conn.close()
+            self.save_edit(edits.Edit('items', 'insert', None, values))
+            self.catalog.set_item(name, value, tab)
+            change = (None, (name, tab))
         else:
+            if where not in self.catalog:
+                # removed by a revalidation or a change from another computer while the dialog was open
+                QMessageBox.warning(self.edit_items_window, "Edit Moving Items", f"{where} was deleted meanwhile.")
+                return
+            old_row = (where, self.catalog.items[where].item_tab)
             if name == '':
-                conn = psycopg2.connect(DB_URL)
-                cursor = conn.cursor()
-                sql = f'''DELETE FROM items WHERE item_name = '{where}'
-                '''
-                cursor.execute(sql)
-                conn.commit()
-                conn.close()
+                self.save_edit(edits.Edit('items', 'delete', where, {}))
+                self.catalog.remove_item(where)
+                change = (old_row, None)
             else:
-                conn = psycopg2.connect(DB_URL)
-                cursor = conn.cursor()
-                sql = f'''UPDATE items SET
-                item_name = '{name}',
-                hidden_value = '{value}',
-                item_tab = '{tab}' WHERE item_name = '{where}'
-                '''
-                cursor.execute(sql)
-                conn.commit()
-                conn.close()
-        while self.i_kitchen > 0:
-            self.kitchen_widget_layout.removeRow(0)
-            self.i_kitchen -= 1
-        while self.i_bedroom > 0:
-            self.bedroom_widget_layout.removeRow(0)
-            self.i_bedroom -= 1
-        while self.i_office > 0:
-            self.office_widget_layout.removeRow(0)
-            self.i_office -= 1
-        while self.i_living > 0:
-            self.living_widget_layout.removeRow(0)
-            self.i_living -= 1
-        while self.i_outside > 0:
-            self.outside_widget_layout.removeRow(0)
-            self.i_outside -= 1
-        while self.i_boxes > 0:
-            self.boxes_widget_layout.removeRow(0)
-            self.i_boxes -= 1
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = '''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name ASC'''
-        cursor.execute(sql)
-        # item list will hold all data of items inside a list
-        self.all_items = cursor.fetchall()
-        conn.close()
-        for item in self.all_items:
-            if item[2] == 'Kitchen':
-                self.add_row(self.kitchen_widget_layout, item[0], item[2])
-            elif item[2] == 'Bedroom':
-                self.add_row(self.bedroom_widget_layout, item[0], item[2])
-            elif item[2] == 'Living Room':
-                self.add_row(self.living_widget_layout, item[0], item[2])
-            elif item[2] == 'Outside':
-                self.add_row(self.outside_widget_layout, item[0], item[2])
-            elif item[2] == 'Office':
-                self.add_row(self.office_widget_layout, item[0], item[2])
-            elif item[2] == 'Boxes':
-                self.add_row(self.boxes_widget_layout, item[0], item[2])
+                self.save_edit(edits.Edit('items', 'update', where, values))
+                self.catalog.set_item(name, value, tab, old_name=where)
+                change = (old_row, (name, tab))
+        self.all_items = self.catalog.rows()
+        self.apply_row_changes([change])
         self.edit_items_window.close()
 
+    def find_row(self, name, tab):
+        # index of the row showing name in tab's list, or -1
+        return self.count_models[tab].row_of(name)
+
+    def apply_row_changes(self, changes):
+        # changes are (old, new) pairs of (name, tab), old is None for an added row and new for a deleted one; only
+        # these rows are removed or inserted, every other row keeps its count, and a renamed row or one moved to
+        # another tab keeps its own count too
+        for old, new in changes:
+            if old == new:
+                continue
+            count = 0
+            if old is not None:
+                count = self.count_models[old[1]].remove_name(old[0])
+                self.name_index.remove(*old)
+            if new is not None and self.find_row(*new) < 0:
+                self.count_models[new[1]].insert_name(new[0], count)
+                self.name_index.add(*new)
+        if self.search_matches is not None:
+            self.search_catalog(self.search_input.text())
+
+    def search_catalog(self, text):
+        # rows that don't match the search are hidden; on the moving page the list switches to a tab with matches
+        # when the one shown has none. Only the list on screen is filtered now, the others when they are shown.
+        self.search_matches = self.name_index.search(text)
+        if self.packing_tab.property("current"):
+            self.filter_count_list(self.packing_list, 'Packing')
+        elif self.moving_tab.property("current"):
+            new_tab = self.current_tab
+            if self.search_matches:
+                tabs = {tab for name, tab in self.search_matches}
+                if self.ALL_TABS[new_tab]["items"] not in tabs:
+                    new_tab = next((tab_name for tab_name, tab_info in self.ALL_TABS.items()
+                                    if tab_info["items"] in tabs), new_tab)
+            self.show_one_tab_and_hide_others(new_tab)
+
+    def filter_count_list(self, view, tab):
+        # only rows whose state changed are touched, and clearing the search resets the list in one call
+        model = self.count_models[tab]
+        hidden = set()
+        if self.search_matches is not None:
+            hidden = set(model.names).difference(name for name, match_tab in self.search_matches if match_tab == tab)
+        was_hidden = self.hidden_rows.get(tab, set())
+        if hidden == was_hidden:
+            return
+        if not hidden:
+            # QListView.reset shows every row again
+            view.reset()
+        else:
+            for name in hidden ^ was_hidden:
+                if model.row_of(name) >= 0:
+                    view.setRowHidden(model.row_of(name), name in hidden)
+        self.hidden_rows[tab] = hidden
+
+    def open_search_match(self):
+        # Enter in the search box opens the count of the first match, on the tab shown if it has one
+        if not self.search_matches:
+            return
+        order = MOVING_TABS + ('Packing',)
+        shown = 'Packing' if self.packing_tab.property("current") else self.ALL_TABS[self.current_tab]["items"]
+        name, tab = min(self.search_matches, key=lambda match: (match[1] != shown, order.index(match[1]), match[0]))
+        if tab == 'Packing':
+            if not self.packing_tab.property("current"):
+                self.show_and_hide_layout(self.packing_layout)
+            view = self.packing_list
+        else:
+            if not self.moving_tab.property("current"):
+                self.show_and_hide_layout(self.moving_layout)
+            tab_name = next(tab_name for tab_name, tab_info in self.ALL_TABS.items() if tab_info["items"] == tab)
+            self.show_one_tab_and_hide_others(tab_name)
+            view = self.ALL_TABS[tab_name]["view"]
+        index = self.count_models[tab].index(self.find_row(name, tab))
+        view.scrollTo(index)
+        view.setFocus()
+        view.edit(index)
+
     def edit_formulas(self):
+        self.run_in_background(self.load_formulas, self.show_edit_formulas)
+
+    def show_edit_formulas(self, formulas):
 
         def change_edited_formula():
             save_button.setEnabled(True)
             formula = choose_item_combobox.currentText().replace(' Formula', '')
+            numbers = self.formulas.numbers[formula]
             line_1.show()
             line_2.show()
             if formula == 'Distance Addition':
                 label_1.setText("If RTD < 30: ")
-                line_1.setText(f"{self.formula_numbers[0][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("then: RTD * ")
-                line_2.setText(f"{self.formula_numbers[0][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Long Distance Addition':
                 label_1.setText("If RTD > 500: ")
-                line_1.setText(f"{self.formula_numbers[1][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("then: ")
-                line_2.setText(f"{self.formula_numbers[1][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Fort Riley Adjustment':
                 label_1.setText("If YES: ")
-                line_1.setText(f"{self.formula_numbers[2][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("else: ")
-                line_2.setText(f"{self.formula_numbers[2][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Second Truck':
                 label_1.setText("If total (with value >= 15) > 30: ")
-                line_1.setText(f"{self.formula_numbers[3][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("else: ")
-                line_2.setText(f"{self.formula_numbers[3][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Small Addition':
                 label_1.setText("If total (with value <= 5) > 100: ")
-                line_1.setText(f"{self.formula_numbers[4][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("else: ")
-                line_2.setText(f"{self.formula_numbers[4][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Med Addition':
                 label_1.setText("If total (with value between 10-15) > 20: ")
-                line_1.setText(f"{self.formula_numbers[5][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("else: ")
-                line_2.setText(f"{self.formula_numbers[5][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Large Addition':
                 label_1.setText("If total (with value >= 20) > 7: ")
-                line_1.setText(f"{self.formula_numbers[6][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("else: ")
-                line_2.setText(f"{self.formula_numbers[6][1]}")
+                line_2.setText(numbers[1])
             elif formula == 'Adjust Multiplier':
                 label_1.setText("Total * ")
-                line_1.setText(f"{self.formula_numbers[7][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("")
                 line_2.clear()
                 line_2.hide()
             elif formula == 'Unload Only':
                 label_1.setText("Estimate Amount * ")
-                line_1.setText(f"{self.formula_numbers[8][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("")
                 line_2.clear()
                 line_2.hide()
             elif formula == 'Load Only':
                 label_1.setText("Estimate Amount * ")
-                line_1.setText(f"{self.formula_numbers[9][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("")
                 line_2.clear()
                 line_2.hide()
             elif formula == 'Low Range':
                 label_1.setText("Estimate Amount * ")
-                line_1.setText(f"{self.formula_numbers[10][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("")
                 line_2.clear()
                 line_2.hide()
             elif formula == 'High Range':
                 label_1.setText("Estimate Amount * ")
-                line_1.setText(f"{self.formula_numbers[11][0]}")
+                line_1.setText(numbers[0])
                 label_2.setText("")
                 line_2.clear()
                 line_2.hide()
 
         self.edit_formulas_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.edit_formulas_window.setWindowIcon(QIcon(resource_path("icons/formula.png")))
+        self.edit_formulas_window.setWindowIcon(resources.icon("formula.png"))
         layout = QGridLayout()
         self.edit_formulas_window.setLayout(layout)
         self.edit_formulas_window.setWindowTitle("Edit Moving Formulas")
-        self.edit_formulas_window.setStyleSheet("QDialog {"
-                                                "background-color: rgb(225, 235, 240);}"
-                                                "QPushButton {"
-                                                "background-color: rgb(165, 209, 255);"
-                                                "border: 2px solid rgb(128, 179, 255);"
-                                                "border-radius: 5px;"
-                                                "padding: 2px 5px;}"
-                                                "QPushButton::hover {"
-                                                "background-color: rgb(128, 179, 255);}"
-                                                "QLineEdit {"
-                                                "border: 1px solid rgb(128, 179, 255);"
-                                                "border-radius: 3px;"
-                                                "background-color: rgb(250, 250, 250);"
-                                                "padding: 2px 2px;}"
-                                                "QComboBox {border: 1px solid rgb(128, 179, 255);"
-                                                "border-radius: 3px;"
-                                                "background-color: rgb(250, 250, 250);"
-                                                "padding: 2px 2px;}"
-                                                "QComboBox::drop-down {"
-                                                "background-color: rgb(250, 250, 250);"
-                                                "border-radius: 3px;}"
-                                                "QComboBox::down-arrow {"
-                                                "image: url(icons/arrow.png);"
-                                                "width: 8px;"                                                 
-                                                "height: 8px;}"
-                                                "QComboBox QAbstractItemView {"
-                                                "background-color: rgb(250, 250, 250);}")
+        self.edit_formulas_window.setStyleSheet(dialog_stylesheet)
         edit_formulas_widget = QWidget(self.edit_formulas_window)
         layout.addWidget(edit_formulas_widget)
         edit_formulas_layout = QGridLayout()
         edit_formulas_widget.setLayout(edit_formulas_layout)
-        # get latest info from database below
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = '''SELECT formula_name, formula_numbers FROM formulas ORDER BY id'''
-        cursor.execute(sql)
-        self.all_formulas = cursor.fetchall()
-        conn.close()
+        # latest info from database was fetched in the background
+        self.formulas = formulas
         # define UI elements below
         choose_item_combobox = QComboBox()
         choose_item_combobox.setPlaceholderText(" ")
-        self.formula_numbers.clear()
-        for item in self.all_formulas:
-            if not item[0] == 'Hidden Value Multiplier':
-                choose_item_combobox.addItem(f"{item[0]} Formula")
-            number = item[1].split("-")
-            self.formula_numbers.append(number)
+        for name in self.formulas.names:
+            if not name == 'Hidden Value Multiplier':
+                choose_item_combobox.addItem(f"{name} Formula")
         choose_item_combobox.currentTextChanged.connect(change_edited_formula)
         formula_frame = QFrame()
         frame_layout = QHBoxLayout()
@@ -1510,187 +1415,97 @@ class UI(QWidget):
         edit_formulas_layout.addWidget(save_button, 2, 0, 1, 1, alignment=Qt.AlignRight)
 
         for item in self.edit_formulas_window.findChildren(QLabel):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_formulas_window.findChildren(QComboBox):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_formulas_window.findChildren(QLineEdit):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_formulas_window.findChildren(QPushButton):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         self.edit_formulas_window.show()
 
     def save_formula(self, value_1, value_2, where, line_2):
         if value_1 == '':
             return
         if not line_2:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            sql = f'''UPDATE formulas SET
-                formula_numbers = '{value_1}' WHERE formula_name = '{where}'
-                '''
-            cursor.execute(sql)
-            conn.commit()
-            conn.close()
+            self.save_edit(edits.Edit('formulas', 'update', where, {'formula_numbers': value_1}),
+                           self.reload_pricing_data)
         else:
             if value_2 == '':
                 return
             values = [value_1, value_2]
             value = '-'.join(values)
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            sql = f'''UPDATE formulas SET
-                formula_numbers = '{value}' WHERE formula_name = '{where}'
-                '''
-            cursor.execute(sql)
-            conn.commit()
-            conn.close()
+            self.save_edit(edits.Edit('formulas', 'update', where, {'formula_numbers': value}),
+                           self.reload_pricing_data)
         self.edit_formulas_window.close()
 
     def edit_hidden_values(self):
+        self.run_in_background(self.load_formulas, self.show_edit_hidden_values)
+
+    def show_edit_hidden_values(self, formulas):
         self.edit_values_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.edit_values_window.setWindowIcon(QIcon(resource_path("icons/diamond.png")))
+        self.edit_values_window.setWindowIcon(resources.icon("diamond.png"))
         self.edit_values_window.setWindowTitle("Edit Moving Item Value")
         layout = QGridLayout()
         self.edit_values_window.setLayout(layout)
-        self.edit_values_window.setStyleSheet("QDialog {"
-                                              "background-color: rgb(225, 235, 240);}"
-                                              "QPushButton {"
-                                              "background-color: rgb(165, 209, 255);"
-                                              "border: 2px solid rgb(128, 179, 255);"
-                                              "border-radius: 5px;"
-                                              "padding: 2px 5px;}"
-                                              "QPushButton::hover {"
-                                              "background-color: rgb(128, 179, 255);}"
-                                              "QLineEdit {"
-                                              "border: 1px solid rgb(128, 179, 255);"
-                                              "border-radius: 3px;"
-                                              "background-color: rgb(250, 250, 250);"
-                                              "padding: 2px 2px;}")
+        self.edit_values_window.setStyleSheet(dialog_stylesheet)
         edit_values_widget = QWidget(self.edit_values_window)
         layout.addWidget(edit_values_widget)
         edit_values_layout = QGridLayout()
         edit_values_widget.setLayout(edit_values_layout)
-        # get latest info from database below
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = '''SELECT formula_numbers FROM formulas ORDER BY id'''
-        cursor.execute(sql)
-        hidden_values_raw = cursor.fetchall()[12][0]
-        hidden_values = hidden_values_raw.split('-')
-        conn.close()
-        label_11 = QLabel()
-        label_11.setText("If hidden value = ")
-        label_21 = QLabel()
-        label_21.setText("If hidden value = ")
-        label_31 = QLabel()
-        label_31.setText("If hidden value = ")
-        label_41 = QLabel()
-        label_41.setText("If hidden value = ")
-        label_51 = QLabel()
-        label_51.setText("If hidden value = ")
-        label_61 = QLabel()
-        label_61.setText("If hidden value = ")
-        line_11 = QLineEdit()
-        line_11.setText(f"{hidden_values[0]}")
-        line_21 = QLineEdit()
-        line_21.setText(f"{hidden_values[2]}")
-        line_31 = QLineEdit()
-        line_31.setText(f"{hidden_values[4]}")
-        line_41 = QLineEdit()
-        line_41.setText(f"{hidden_values[6]}")
-        line_51 = QLineEdit()
-        line_51.setText(f"{hidden_values[8]}")
-        line_61 = QLineEdit()
-        line_61.setText(f"{hidden_values[10]}")
-        label_12 = QLabel()
-        label_12.setText(", then multiplier =")
-        label_22 = QLabel()
-        label_22.setText(", then multiplier =")
-        label_32 = QLabel()
-        label_32.setText(", then multiplier =")
-        label_42 = QLabel()
-        label_42.setText(", then multiplier =")
-        label_52 = QLabel()
-        label_52.setText(", then multiplier =")
-        label_62 = QLabel()
-        label_62.setText(", then multiplier =")
-        line_12 = QLineEdit()
-        line_12.setText(f"{hidden_values[1]}")
-        line_22 = QLineEdit()
-        line_22.setText(f"{hidden_values[3]}")
-        line_32 = QLineEdit()
-        line_32.setText(f"{hidden_values[5]}")
-        line_42 = QLineEdit()
-        line_42.setText(f"{hidden_values[7]}")
-        line_52 = QLineEdit()
-        line_52.setText(f"{hidden_values[9]}")
-        line_62 = QLineEdit()
-        line_62.setText(f"{hidden_values[11]}")
-        line_11.setValidator(self.integer_only)
-        line_21.setValidator(self.integer_only)
-        line_31.setValidator(self.integer_only)
-        line_41.setValidator(self.integer_only)
-        line_51.setValidator(self.integer_only)
-        line_61.setValidator(self.integer_only)
-        line_12.setValidator(self.integer_only)
-        line_22.setValidator(self.integer_only)
-        line_32.setValidator(self.integer_only)
-        line_42.setValidator(self.integer_only)
-        line_52.setValidator(self.integer_only)
-        line_62.setValidator(self.integer_only)
+        # latest info from database was fetched in the background
+        self.formulas = formulas
+        value_lines = []
+
+        def add_value_row(value, multiplier):
+            row = len(value_lines)
+            value_label = QLabel()
+            value_label.setText("If hidden value = ")
+            value_label.setFont(resources.font(9))
+            value_line = QLineEdit()
+            value_line.setText(f"{value}")
+            value_line.setValidator(self.integer_only)
+            value_line.setFont(resources.font(9))
+            multiplier_label = QLabel()
+            multiplier_label.setText(", then multiplier =")
+            multiplier_label.setFont(resources.font(9))
+            multiplier_line = QLineEdit()
+            multiplier_line.setText(f"{multiplier}")
+            multiplier_line.setValidator(self.integer_only)
+            multiplier_line.setFont(resources.font(9))
+            edit_values_layout.addWidget(value_label, row, 0, 1, 1)
+            edit_values_layout.addWidget(value_line, row, 1, 1, 1)
+            edit_values_layout.addWidget(multiplier_label, row, 2, 1, 1)
+            edit_values_layout.addWidget(multiplier_line, row, 3, 1, 1)
+            value_lines.append((value_line, multiplier_line))
+            edit_values_layout.addWidget(add_row_button, row + 1, 0, 1, 1, alignment=Qt.AlignLeft)
+            edit_values_layout.addWidget(save_button, row + 1, 3, 1, 1)
+
+        add_row_button = QPushButton()
+        add_row_button.setIcon(resources.icon("plus.png"))
+        add_row_button.setToolTip("Add another hidden value")
+        add_row_button.clicked.connect(lambda: add_value_row("", ""))
         save_button = QPushButton()
-        save_button.clicked.connect(lambda: self.save_value(line_11.text(), line_12.text(), line_21.text(),
-                                                            line_22.text(), line_31.text(), line_32.text(),
-                                                            line_41.text(), line_42.text(), line_51.text(),
-                                                            line_52.text(), line_61.text(), line_62.text(),
-                                                            ))
+        save_button.clicked.connect(lambda: self.save_value([(value_line.text(), multiplier_line.text())
+                                                             for value_line, multiplier_line in value_lines]))
         save_button.setText("Save")
-        edit_values_layout.addWidget(label_11, 0, 0, 1, 1)
-        edit_values_layout.addWidget(label_21, 1, 0, 1, 1)
-        edit_values_layout.addWidget(label_31, 2, 0, 1, 1)
-        edit_values_layout.addWidget(label_41, 3, 0, 1, 1)
-        edit_values_layout.addWidget(label_51, 4, 0, 1, 1)
-        edit_values_layout.addWidget(label_61, 5, 0, 1, 1)
-        edit_values_layout.addWidget(line_11, 0, 1, 1, 1)
-        edit_values_layout.addWidget(line_21, 1, 1, 1, 1)
-        edit_values_layout.addWidget(line_31, 2, 1, 1, 1)
-        edit_values_layout.addWidget(line_41, 3, 1, 1, 1)
-        edit_values_layout.addWidget(line_51, 4, 1, 1, 1)
-        edit_values_layout.addWidget(line_61, 5, 1, 1, 1)
-        edit_values_layout.addWidget(label_12, 0, 2, 1, 1)
-        edit_values_layout.addWidget(label_22, 1, 2, 1, 1)
-        edit_values_layout.addWidget(label_32, 2, 2, 1, 1)
-        edit_values_layout.addWidget(label_42, 3, 2, 1, 1)
-        edit_values_layout.addWidget(label_52, 4, 2, 1, 1)
-        edit_values_layout.addWidget(label_62, 5, 2, 1, 1)
-        edit_values_layout.addWidget(line_12, 0, 3, 1, 1)
-        edit_values_layout.addWidget(line_22, 1, 3, 1, 1)
-        edit_values_layout.addWidget(line_32, 2, 3, 1, 1)
-        edit_values_layout.addWidget(line_42, 3, 3, 1, 1)
-        edit_values_layout.addWidget(line_52, 4, 3, 1, 1)
-        edit_values_layout.addWidget(line_62, 5, 3, 1, 1)
-        edit_values_layout.addWidget(save_button, 6, 3, 1, 1)
-
-        for item in self.edit_values_window.findChildren(QLabel):
-            item.setFont(QFont('Times', 9))
-        for item in self.edit_values_window.findChildren(QLineEdit):
-            item.setFont(QFont('Times', 9))
-        for item in self.edit_values_window.findChildren(QPushButton):
-            item.setFont(QFont('Times', 9))
+        save_button.setFont(resources.font(9))
+        save_button.setToolTip("Leave a row blank to remove it")
+        for value, multiplier in self.formulas.hidden_value_pairs():
+            add_value_row(value, multiplier)
         self.edit_values_window.show()
 
-    def save_value(self, value1, value2, value3, value4, value5, value6, value7, value8, value9, value10, value11,
-                   value12):
-        values = [value1, value2, value3, value4, value5, value6, value7, value8, value9, value10, value11, value12]
+    def save_value(self, pairs):
+        values = []
+        for value, multiplier in pairs:
+            if value == '' or multiplier == '':
+                continue
+            values.extend([value, multiplier])
+        if not values:
+            return
         values_raw = '-'.join(values)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = f'''UPDATE formulas SET
-                formula_numbers = '{values_raw}' WHERE formula_name = 'Hidden Value Multiplier'
-                '''
-        cursor.execute(sql)
-        conn.commit()
-        conn.close()
+        self.save_edit(edits.Edit('formulas', 'update', 'Hidden Value Multiplier', {'formula_numbers': values_raw}),
+                       self.reload_pricing_data)
         self.edit_values_window.close()
 
     def import_list(self):
@@ -1752,65 +1567,9 @@ class UI(QWidget):
             self.main_estimate_label.setText("Error: Make sure headers are 'DETAILS' and 'OUTPUT'!")
             return
 
-        while items:
-            for x in self.kitchen_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if not items:
-                break
-            for x in self.bedroom_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if not items:
-                break
-            for x in self.living_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if not items:
-                break
-            for x in self.outside_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if not items:
-                break
-            for x in self.office_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if not items:
-                break
-            for x in self.boxes_scroll_area.findChildren(QLabel):
-                if items[0] == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(figure[0])
-                    items.pop(0)
-                    figure.pop(0)
-                if not items:
-                    break
-            if items:
+        for name, count in zip(items, figure):
+            if not self.set_item_count(name, count_list.to_count(count)):
                 invalid_item = True
-                items.pop(0)
-                figure.pop(0)
-            else:
-                break
         if invalid_item:
             self.main_estimate_label.setText("Some items couldn't be imported.")
         else:
@@ -1819,9 +1578,7 @@ class UI(QWidget):
         self.unload_only_estimate_label.setText("")
 
         for index, item in enumerate(packing_items):
-            for x in self.packing_scroll_area.findChildren(QLabel):
-                if item == x.text():
-                    x.parent().findChildren(QLineEdit)[0].setText(packing_figure[index][0])
+            self.count_models['Packing'].set_count(item, count_list.to_count(packing_figure[index][0]))
 
         note_count = 0
         for z in f['DETAILS']:
@@ -1847,43 +1604,155 @@ class UI(QWidget):
         self.calculate_estimate()
         self.calculate_packing_cost()
 
+    def set_item_count(self, name, count):
+        # the catalog knows each item's tab, so the row is found without looking through the other tabs
+        item = self.catalog.items.get(name)
+        return item is not None and item.item_tab in MOVING_TABS and \
+            self.count_models[item.item_tab].set_count(name, count)
+
     def clear_selections(self):
-        for item in self.kitchen_widget.findChildren(QLineEdit):
-            item.setText("0")
-        for item in self.bedroom_widget.findChildren(QLineEdit):
-            item.setText("0")
-        for item in self.living_widget.findChildren(QLineEdit):
-            item.setText("0")
-        for item in self.outside_widget.findChildren(QLineEdit):
-            item.setText("0")
-        for item in self.boxes_widget.findChildren(QLineEdit):
-            item.setText("0")
-        for item in self.office_widget.findChildren(QLineEdit):
-            item.setText("0")
+        for tab in MOVING_TABS:
+            self.count_models[tab].clear_counts()
         self.is_moving_calculated = False
 
     def clear_packing_selections(self):
-        for item in self.packing_widget.findChildren(QLineEdit):
-            item.setText("0")
+        self.count_models['Packing'].clear_counts()
         self.is_packing_calculated = False
 
-    def calculate_estimate(self):
+    def get_item_counts(self):
+        counts = []
+        for tab in MOVING_TABS:
+            counts += self.count_models[tab].items()
+        return counts
+
+    def get_running_estimate(self):
+        # None until the formulas are loaded; count and input slots never load them, set_pricing_data updates the
+        # label once they arrive
+        if self.formulas is None:
+            return None
+        if self.running_estimate is None or not self.running_estimate.is_current(self.catalog, self.formulas):
+            self.running_estimate = pricing.RunningEstimate(self.catalog, self.formulas, self.get_item_counts())
+        return self.running_estimate
+
+    def change_item_count(self, name, count):
+        running_estimate = self.get_running_estimate()
+        if running_estimate is not None:
+            running_estimate.set_count(name, count)
+        self.update_live_estimate()
+
+    def update_live_estimate(self):
+        try:
+            round_trip_distance = int(self.round_trip_distance.text())
+            estimator_addition = int(self.estimator_adjustment.text())
+        except ValueError:
+            self.live_estimate_label.setText("")
+            return
+        running_estimate = self.get_running_estimate()
+        if running_estimate is None or not running_estimate.counts:
+            self.live_estimate_label.setText("")
+            return
+        estimate = running_estimate.estimate(round_trip_distance, self.ft_riley_adjustment.currentText() == 'Yes',
+                                             estimator_addition, self.slider.value())
+        self.live_estimate_label.setText(f"Live Estimate: ${'{:.2f}'.format(estimate.final_value)}")
 
-        def get_multiplier(value):
-            if value == int(hidden_value_formulas[0]):
-                return int(hidden_value_formulas[1])
-            elif value == int(hidden_value_formulas[2]):
-                return int(hidden_value_formulas[3])
-            elif value == int(hidden_value_formulas[4]):
-                return int(hidden_value_formulas[5])
-            elif value == int(hidden_value_formulas[6]):
-                return int(hidden_value_formulas[7])
-            elif value == int(hidden_value_formulas[8]):
-                return int(hidden_value_formulas[9])
-            elif value == int(hidden_value_formulas[10]):
-                return int(hidden_value_formulas[11])
-            else:
-                return 1
+    def load_formulas(self):
+        conn = get_db_connection(self.is_online)
+        formulas = pricing.FormulaTable(queries.fetch_all(conn, 'formulas'))
+        conn.close()
+        return formulas
+
+    def get_room_counts(self):
+        return self.count_models['Packing'].items()
+
+    def load_pricing_data(self):
+        if self.is_online:
+            # formulas, supplies and rooms come back together in one round trip
+            conn = online_pool.connect()
+            rows = db.fetch_tables(conn, {table: SYNCED_TABLES[table] for table in ('formulas', 'supplies', 'rooms')})
+            conn.close()
+            rows['formulas'] = [row[1:] for row in rows['formulas']]
+        else:
+            conn = offline_db.connect()
+            rows = {table: queries.fetch_all(conn, table) for table in ('formulas', 'supplies', 'rooms')}
+            conn.close()
+        formulas = pricing.FormulaTable(rows['formulas'])
+        return formulas, pricing.PackingCatalog(rows['rooms'], rows['supplies'])
+
+    def set_pricing_data(self, pricing_data):
+        self.formulas, self.packing = pricing_data
+        self.pricing_error = None
+        self.update_live_estimate()
+
+    def reload_pricing_data(self):
+        # load formulas and packing matrices again off the GUI thread; the previous ones keep pricing quotes until the
+        # new ones arrive, and stay if the load fails
+        if self.pricing_task is not None:
+            self.pricing_task.cancel()
+        self.pricing_task = self.run_in_background(self.load_pricing_data, self.set_pricing_data,
+                                                   self.fail_pricing_data)
+
+    def fail_pricing_data(self, error):
+        self.pricing_error = error
+
+    def pricing_data_error(self):
+        # message for Calculate while there is no pricing data yet, None once there is; Calculate never loads it on the
+        # GUI thread, it only asks for it again if no load is under way
+        if self.formulas is not None and self.packing is not None:
+            return None
+        error = self.pricing_error
+        if self.pricing_task not in self.tasks:
+            self.reload_pricing_data()
+        if error is not None:
+            return "Error: You have to go online and sync data to use the app"
+        return "Pricing data is loading, try again in a moment."
+
+    def run_in_background(self, job, on_finished, on_failed=None, cancellable=True, quiet=False):
+        task = workers.Task(job)
+        task.cancellable = cancellable
+        task.quiet = quiet
+        task.signals.finished.connect(lambda result: None if task.cancelled else on_finished(result))
+        on_failed = on_failed or self.show_task_error
+        task.signals.failed.connect(lambda error: None if task.cancelled else on_failed(error))
+        task.signals.done.connect(lambda: self.finish_task(task))
+        self.tasks.append(task)
+        self.update_busy_indicator()
+        self.thread_pool.start(task)
+        return task
+
+    def finish_task(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+        self.update_busy_indicator()
+
+    def cancel_tasks(self):
+        # only loads the user is waiting on; probing, replaying and revalidating keep going
+        for task in self.tasks:
+            if task.cancellable:
+                task.cancel()
+        self.tasks = [task for task in self.tasks if not task.cancellable]
+        self.update_busy_indicator()
+
+    def update_busy_indicator(self):
+        tasks = [task for task in self.tasks if not task.quiet]
+        if tasks:
+            self.busy_label.setText("Loading...")
+            self.busy_label.setToolTip("")
+            self.busy_label.show()
+            self.cancel_task_button.setVisible(any(task.cancellable for task in tasks))
+            self.setCursor(Qt.BusyCursor)
+        else:
+            # an error message stays until the next task starts
+            if self.busy_label.text() == "Loading...":
+                self.busy_label.hide()
+            self.cancel_task_button.hide()
+            self.unsetCursor()
+
+    def show_task_error(self, error):
+        self.busy_label.setText("Couldn't reach the database")
+        self.busy_label.setToolTip(str(error))
+        self.busy_label.show()
+
+    def calculate_estimate(self):
 
         def close_details(main_estimate_text, unload_only_estimate_text, load_only_estimate_text):
             self.see_details_button.setText("See Details")
@@ -1943,7 +1812,7 @@ class UI(QWidget):
             layout = QGridLayout()
             self.export_window.setLayout(layout)
             self.export_window.setWindowTitle("Export List")
-            self.export_window.setWindowIcon(QIcon(resource_path("icons/export.png")))
+            self.export_window.setWindowIcon(resources.icon("export.png"))
             self.export_window.setStyleSheet("QDialog {"
                                              "background-color: rgb(225, 235, 240);}"
                                              "QPushButton {"
@@ -1981,11 +1850,11 @@ class UI(QWidget):
             export_widget_layout.addWidget(export_button, 2, 0, 1, 1, alignment=Qt.AlignCenter)
             export_widget_layout.addWidget(error_note, 3, 0, 1, 1, alignment=Qt.AlignCenter)
             for item in self.export_window.findChildren(QPushButton):
-                item.setFont(QFont('Times', 9))
+                item.setFont(resources.font(9))
             for item in self.export_window.findChildren(QPlainTextEdit):
-                item.setFont(QFont('Times', 9))
+                item.setFont(resources.font(9))
             for item in self.export_window.findChildren(QCheckBox):
-                item.setFont(QFont('Times', 9))
+                item.setFont(resources.font(9))
             self.export_window.show()
 
         def export_to_excel(items, base, distance, long_distance, fort_riley, second_truck, small, med, large,
@@ -2055,164 +1924,40 @@ class UI(QWidget):
                 f.close()
                 window.close()
 
-        # get latest formulas below
-        conn = get_db_connection(self.is_online)
-        cursor = conn.cursor()
-        sql = '''SELECT formula_name, formula_numbers FROM formulas ORDER BY id'''
-        cursor.execute(sql)
-        self.all_formulas = cursor.fetchall()
-        conn.close()
-        distance_fee = self.all_formulas[0][1].split('-')
-        long_distance_fee = self.all_formulas[1][1].split('-')
-        fort_riley_fee = self.all_formulas[2][1].split('-')
-        second_truck_fee = self.all_formulas[3][1].split('-')
-        small_fee = self.all_formulas[4][1].split('-')
-        med_fee = self.all_formulas[5][1].split('-')
-        large_fee = self.all_formulas[6][1].split('-')
-        adjust = float(self.all_formulas[7][1])
-        unload = float(self.all_formulas[8][1])
-        load = float(self.all_formulas[9][1])
-        low = float(self.all_formulas[10][1])
-        low_mid = float((low + 1) / 2)
-        high = float(self.all_formulas[11][1])
-        high_mid = float((high + 1) / 2)
-        hidden_value_formulas = self.all_formulas[12][1].split('-')
         slider_value = self.slider.value()
 
-        # prepare values below
-        item_list = []
-        number_list = []
-        value_list = []
-        counted_items = []
-        base_score = 0
-        second_truck_counter = 0
-        small_counter = 0
-        med_counter = 0
-        large_counter = 0
-
-        # get names as a list
-        for item in self.kitchen_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        for item in self.bedroom_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        for item in self.living_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        for item in self.outside_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        for item in self.office_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        for item in self.boxes_widget.findChildren(QLabel):
-            item_list.append(item.text())
-
-        # get numbers as a list
-        for item in self.kitchen_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-        for item in self.bedroom_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-        for item in self.living_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-        for item in self.outside_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-        for item in self.office_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-        for item in self.boxes_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-
-        # get values as a list
-        for element in item_list:
-            for element2 in self.all_items:
-                if element == element2[0]:
-                    value_list.append(element2[1])
-
-        # make all calculations
-        for i in range(len(item_list)):
-            if not number_list[i] == '0':
-                multiplier = get_multiplier(int(value_list[i]))
-                base_score += int(number_list[i]) * int(value_list[i]) * multiplier
-                counted_items.append([item_list[i], number_list[i]])
-                if int(value_list[i]) >= 15:
-                    second_truck_counter += int(number_list[i])
-                if int(value_list[i]) <= 5:
-                    small_counter += int(number_list[i])
-                if int(value_list[i]) >= 10:
-                    if int(value_list[i]) <= 15:
-                        med_counter += int(number_list[i])
-                if int(value_list[i]) >= 20:
-                    large_counter += int(number_list[i])
         try:
-            if int(self.round_trip_distance.text()) < 30:
-                distance_addition = int(distance_fee[0])
-            else:
-                distance_addition = int(distance_fee[1]) * int(self.round_trip_distance.text())
-            if int(self.round_trip_distance.text()) > 500:
-                long_distance_addition = int(long_distance_fee[0])
-            else:
-                long_distance_addition = int(long_distance_fee[1])
+            round_trip_distance = int(self.round_trip_distance.text())
             estimator_addition = int(self.estimator_adjustment.text())
+            error = self.pricing_data_error()
         except ValueError:
-            self.main_estimate_label.setText("Round trip distance or estimator adjustment is blank!")
+            error = "Round trip distance or estimator adjustment is blank!"
+        if error is not None:
+            self.main_estimate_label.setText(error)
             self.load_only_estimate_label.setText("")
             self.unload_only_estimate_label.setText("")
             self.see_details_button.hide()
             self.details_frame.hide()
             self.export_list_button.hide()
             return
-        if self.ft_riley_adjustment.currentText() == 'Yes':
-            fort_riley_addition = int(fort_riley_fee[0])
-        else:
-            fort_riley_addition = int(fort_riley_fee[1])
-        if second_truck_counter > 30:
-            second_truck_addition = int(second_truck_fee[0])
-        else:
-            second_truck_addition = int(second_truck_fee[1])
-        if small_counter > 100:
-            small_addition = int(small_fee[0])
-        else:
-            small_addition = int(small_fee[1])
-        if med_counter > 20:
-            med_addition = int(med_fee[0])
-        else:
-            med_addition = int(med_fee[1])
-        if large_counter > 7:
-            large_addition = int(large_fee[0])
-        else:
-            large_addition = int(large_fee[1])
-        total_before = base_score + distance_addition + long_distance_addition + fort_riley_addition +\
-                       second_truck_addition + small_addition + med_addition + large_addition + estimator_addition
-        total_estimated = total_before * adjust
-        if slider_value == 1:
-            final_value = round(total_estimated * low, 2)
-            scale = low
-        elif slider_value == 2:
-            final_value = round(total_estimated * low_mid, 2)
-            scale = low_mid
-        elif slider_value == 3:
-            final_value = round(total_estimated * 1, 2)
-            scale = 1
-        elif slider_value == 4:
-            final_value = round(total_estimated * high_mid, 2)
-            scale = high_mid
-        else:
-            final_value = round(total_estimated * high, 2)
-            scale = high
+        quote = (self.catalog, self.formulas, self.get_item_counts(), round_trip_distance,
+                 self.ft_riley_adjustment.currentText() == 'Yes', estimator_addition, slider_value)
+        estimate = self.quote_cache.get(pricing.estimate_fingerprint(*quote),
+                                        lambda: pricing.calculate_estimate(*quote))
+        self.calculate_estimate_button.setToolTip(f"Quote cache: {self.quote_cache.hits} hits, "
+                                                  f"{self.quote_cache.misses} misses")
+        base_score = estimate.base_score
+        distance_addition = estimate.distance_addition
+        long_distance_addition = estimate.long_distance_addition
+        fort_riley_addition = estimate.fort_riley_addition
+        second_truck_addition = estimate.second_truck_addition
+        small_addition = estimate.small_addition
+        med_addition = estimate.med_addition
+        large_addition = estimate.large_addition
+        adjust = estimate.adjust
+        scale = estimate.scale
+        final_value = estimate.final_value
+        counted_items = estimate.counted_items
         if final_value == 0:
             self.main_estimate_label.setText("No item entered!")
             self.load_only_estimate_label.setText("")
@@ -2221,10 +1966,9 @@ class UI(QWidget):
             self.details_frame.hide()
             self.export_list_button.hide()
             return
-        load_only_final = round(final_value * load, 2)
-        unload_only_final = round(final_value * unload, 2)
-        inputs = [int(self.round_trip_distance.text()), estimator_addition, self.ft_riley_adjustment.currentText(),
-                  slider_value]
+        load_only_final = estimate.load_only_final
+        unload_only_final = estimate.unload_only_final
+        inputs = [round_trip_distance, estimator_addition, self.ft_riley_adjustment.currentText(), slider_value]
         if self.moving_calculation_details_opened:
             see_details(base_score, distance_addition,
                         long_distance_addition, fort_riley_addition,
@@ -2278,13 +2022,12 @@ class UI(QWidget):
         summary_moving_items_text = "Items to Move: \n\n"
         total_moving_items_count = 0
         total_moving_boxes_count = 0
-        for i in range(len(item_list)):
-            if not number_list[i] == '0':
-                summary_moving_items_text += f"{item_list[i]} x{number_list[i]}\n"
-                if item_list[i] != "Boxes" and item_list[i] != "Totes":
-                    total_moving_items_count += int(number_list[i])
-                else:
-                    total_moving_boxes_count += int(number_list[i])
+        for name, count in counted_items:
+            summary_moving_items_text += f"{name} x{count}\n"
+            if name != "Boxes" and name != "Totes":
+                total_moving_items_count += count
+            else:
+                total_moving_boxes_count += count
         summary_moving_items_text += f"\n>Total Items: {total_moving_items_count}\n"
         summary_moving_items_text += f">Total Boxes/Totes: {total_moving_boxes_count}"
         self.summary_moving_items_label.setText(summary_moving_items_text)
@@ -2292,177 +2035,64 @@ class UI(QWidget):
         self.packs_mileage_2.setText(f"Mileage: {self.round_trip_distance.text()}")
 
     def calculate_packing_cost(self):
-        # refresh room names and counts first
+        error = self.pricing_data_error()
+        if error is not None:
+            self.packs_total_packing_cost.setText(error)
+            return
+        quote = (self.packing, self.formulas, self.get_room_counts(), self.packs_slider.value())
+        packing_cost = self.quote_cache.get(pricing.packing_fingerprint(*quote),
+                                            lambda: pricing.calculate_packing_cost(*quote))
+        self.calculate_packing_cost_button.setToolTip(f"Quote cache: {self.quote_cache.hits} hits, "
+                                                      f"{self.quote_cache.misses} misses")
+        small_box_count, medium_box_count, large_box_count, paper_roll_count, tape_roll_count = \
+            packing_cost.material_counts
+        small_box_cost, medium_box_cost, large_box_cost, paper_roll_cost, tape_roll_cost = packing_cost.supply_costs
+        small_box_resell_price, medium_box_resell_price, large_box_resell_price, paper_roll_resell_price, \
+            tape_roll_resell_price = packing_cost.resell_prices
+        labor_count = packing_cost.labor_hours
+        labor_cost = packing_cost.labor_cost
+        total_supply_cost = packing_cost.total_supply_cost
+        total_packing_cost_without_labor = packing_cost.total_resell_price
+        total_packing_cost = packing_cost.total_packing_cost
+
+        # refresh room names and counts
         self.room_names_and_counts = []
-        # get latest rooms below
-        conn = get_db_connection(self.is_online)
-        cursor = conn.cursor()
-        cursor.execute('''SELECT * FROM rooms ORDER BY id ASC''')
-        self.all_rooms = cursor.fetchall()
-
-        cursor.execute('''SELECT * FROM supplies ORDER BY id ASC''')
-        self.all_supplies = cursor.fetchall()
-
-        cursor.execute('''SELECT formula_name, formula_numbers FROM formulas ORDER BY id''')
-        self.all_formulas = cursor.fetchall()
-        conn.close()
-
-        low = float(self.all_formulas[10][1])
-        low_mid = float((low + 1) / 2)
-        high = float(self.all_formulas[11][1])
-        high_mid = float((high + 1) / 2)
-
-        item_list = []
-        number_list = []
-
-        # get names as a list
-        for item in self.packing_widget.findChildren(QLabel):
-            item_list.append(item.text())
-        # get numbers as a list
-        for item in self.packing_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list.append(item.text())
-            else:
-                number_list.append('0')
-
-        small_box_count = 0
-        medium_box_count = 0
-        large_box_count = 0
-        paper_roll_count = 0
-        tape_roll_count = 0
-        labor_count = 0
-
-        ###
         summary_packing_rooms_text = "Rooms to Pack: \n\n"
-
-        for index, item in enumerate(number_list):
-            if item != '0':
-                room_name = item_list[index]
-                room = next((item for item in self.all_rooms if item[1] == room_name), None)
-                if room is None:
-                    return
-                small_box_count += int(item) * room[2]
-                medium_box_count += int(item) * room[3]
-                large_box_count += int(item) * room[4]
-                paper_roll_count += int(item) * room[5]
-                tape_roll_count += int(item) * room[6]
-                labor_count += int(item) * room[7]
-
-                summary_packing_rooms_text += f"{room_name} x{item}\n"
-                self.room_names_and_counts.append([room_name, item])
-
+        for room_name, count in packing_cost.counted_rooms:
+            summary_packing_rooms_text += f"{room_name} x{count}\n"
+            self.room_names_and_counts.append([room_name, str(count)])
         self.summary_packing_rooms_label.setText(summary_packing_rooms_text)
-        
-        all_materials_count = small_box_count + medium_box_count + large_box_count + paper_roll_count + tape_roll_count
-
-        slider_value = self.packs_slider.value()
-        adjust_scale = 1
-        if slider_value == 1:
-            adjust_scale = low
-        elif slider_value == 2:
-            adjust_scale = low_mid
-        elif slider_value == 3:
-            adjust_scale = 1
-        elif slider_value == 4:
-            adjust_scale = high_mid
-        elif slider_value == 5:
-            adjust_scale = high
-        
-        # multiply all counts with order_price
-        small_box_cost = small_box_count * self.all_supplies[0][3]
-        medium_box_cost = medium_box_count * self.all_supplies[1][3]
-        large_box_cost = large_box_count * self.all_supplies[2][3]
-        paper_roll_cost = paper_roll_count * self.all_supplies[3][3]
-        tape_roll_cost = tape_roll_count * self.all_supplies[4][3]
-
-        small_box_resell_price = small_box_count * self.all_supplies[0][4] * adjust_scale
-        medium_box_resell_price = medium_box_count * self.all_supplies[1][4] * adjust_scale
-        large_box_resell_price = large_box_count * self.all_supplies[2][4] * adjust_scale
-        paper_roll_resell_price = paper_roll_count * self.all_supplies[3][4] * adjust_scale
-        tape_roll_resell_price = tape_roll_count * self.all_supplies[4][4] * adjust_scale
-        
-        total_supply_cost = (
-            small_box_cost +
-            medium_box_cost +
-            large_box_cost +
-            paper_roll_cost +
-            tape_roll_cost
-        )
-        total_packing_cost_without_labor = (
-            small_box_resell_price +
-            medium_box_resell_price +
-            large_box_resell_price +
-            paper_roll_resell_price +
-            tape_roll_resell_price
-        )
-
-        labor_cost = labor_count * self.all_supplies[8][3] * adjust_scale
-        total_packing_cost = total_packing_cost_without_labor + labor_cost
 
         # set new calculated numbers
-        self.staff_table_widget.setItem(0, 1, QTableWidgetItem(str(round(small_box_count, 2) if is_float_not_integer(small_box_count) else int(small_box_count))))
-        self.staff_table_widget.setItem(0, 2, QTableWidgetItem("$" + str(round(small_box_cost, 2) if is_float_not_integer(small_box_cost) else int(small_box_cost))))
-        self.staff_table_widget.setItem(0, 3, QTableWidgetItem("$" + str(round(small_box_resell_price, 2) if is_float_not_integer(small_box_resell_price) else int(small_box_resell_price))))
-        self.staff_table_widget.setItem(0, 4, QTableWidgetItem("$" + str(round(small_box_resell_price - small_box_cost, 2) if is_float_not_integer(small_box_resell_price - small_box_cost) else int(small_box_resell_price - small_box_cost))))
-
-        self.staff_table_widget.setItem(1, 1, QTableWidgetItem(str(round(medium_box_count, 2) if is_float_not_integer(medium_box_count) else int(medium_box_count))))
-        self.staff_table_widget.setItem(1, 2, QTableWidgetItem("$" + str(round(medium_box_cost, 2) if is_float_not_integer(medium_box_cost) else int(medium_box_cost))))
-        self.staff_table_widget.setItem(1, 3, QTableWidgetItem("$" + str(round(medium_box_resell_price, 2) if is_float_not_integer(medium_box_resell_price) else int(medium_box_resell_price))))
-        self.staff_table_widget.setItem(1, 4, QTableWidgetItem("$" + str(round(medium_box_resell_price - medium_box_cost, 2) if is_float_not_integer(medium_box_resell_price - medium_box_cost) else int(medium_box_resell_price - medium_box_cost))))
-
-        self.staff_table_widget.setItem(2, 1, QTableWidgetItem(str(round(large_box_count, 2) if is_float_not_integer(large_box_count) else int(large_box_count))))
-        self.staff_table_widget.setItem(2, 2, QTableWidgetItem("$" + str(round(large_box_cost, 2) if is_float_not_integer(large_box_cost) else int(large_box_cost))))
-        self.staff_table_widget.setItem(2, 3, QTableWidgetItem("$" + str(round(large_box_resell_price, 2) if is_float_not_integer(large_box_resell_price) else int(large_box_resell_price))))
-        self.staff_table_widget.setItem(2, 4, QTableWidgetItem("$" + str(round(large_box_resell_price - large_box_cost, 2) if is_float_not_integer(large_box_resell_price - large_box_cost) else int(large_box_resell_price - large_box_cost))))
-
-        self.staff_table_widget.setItem(3, 1, QTableWidgetItem(str(round(paper_roll_count, 2) if is_float_not_integer(paper_roll_count) else int(paper_roll_count))))
-        self.staff_table_widget.setItem(3, 2, QTableWidgetItem("$" + str(round(paper_roll_cost, 2) if is_float_not_integer(paper_roll_cost) else int(paper_roll_cost))))
-        self.staff_table_widget.setItem(3, 3, QTableWidgetItem("$" + str(round(paper_roll_resell_price, 2) if is_float_not_integer(paper_roll_resell_price) else int(paper_roll_resell_price))))
-        self.staff_table_widget.setItem(3, 4, QTableWidgetItem("$" + str(round(paper_roll_resell_price - paper_roll_cost, 2) if is_float_not_integer(paper_roll_resell_price - paper_roll_cost) else int(paper_roll_resell_price - paper_roll_cost))))
-
-        self.staff_table_widget.setItem(4, 1, QTableWidgetItem(str(round(tape_roll_count, 2) if is_float_not_integer(tape_roll_count) else int(tape_roll_count))))
-        self.staff_table_widget.setItem(4, 2, QTableWidgetItem("$" + str(round(tape_roll_cost, 2) if is_float_not_integer(tape_roll_cost) else int(tape_roll_cost))))
-        self.staff_table_widget.setItem(4, 3, QTableWidgetItem("$" + str(round(tape_roll_resell_price, 2) if is_float_not_integer(tape_roll_resell_price) else int(tape_roll_resell_price))))
-        self.staff_table_widget.setItem(4, 4, QTableWidgetItem("$" + str(round(tape_roll_resell_price - tape_roll_cost, 2) if is_float_not_integer(tape_roll_resell_price - tape_roll_cost) else int(tape_roll_resell_price - tape_roll_cost))))
-
-        self.staff_table_widget.setItem(5, 1, QTableWidgetItem(str(round(all_materials_count, 2) if is_float_not_integer(all_materials_count) else int(all_materials_count))))
-        self.staff_table_widget.setItem(5, 2, QTableWidgetItem("$" + str(round(total_supply_cost, 2) if is_float_not_integer(total_supply_cost) else int(total_supply_cost))))
-        self.staff_table_widget.setItem(5, 3, QTableWidgetItem("$" + str(round(total_packing_cost_without_labor, 2) if is_float_not_integer(total_packing_cost_without_labor) else int(total_packing_cost_without_labor))))
-        self.staff_table_widget.setItem(5, 4, QTableWidgetItem("$" + str(round(total_packing_cost_without_labor - total_supply_cost, 2) if is_float_not_integer(total_packing_cost_without_labor - total_supply_cost) else int(total_packing_cost_without_labor - total_supply_cost))))
-
-        for row in range(self.staff_table_widget.rowCount()):
-            for col in range(1, self.staff_table_widget.columnCount()):
-                item = self.staff_table_widget.item(row, col)
-                if item is not None:
-                    item.setTextAlignment(Qt.AlignCenter)
-
-        self.packs_small_boxes.setText(f"Small Boxes: {str(round(small_box_count, 2) if is_float_not_integer(small_box_count) else int(small_box_count))}")
-        self.packs_medium_boxes.setText(f"Medium Boxes: {str(round(medium_box_count, 2) if is_float_not_integer(medium_box_count) else int(medium_box_count))}")
-        self.packs_large_boxes.setText(f"Large Boxes: {str(round(large_box_count, 2) if is_float_not_integer(large_box_count) else int(large_box_count))}")
-        self.packs_paper_rolls.setText(f"Paper Rolls: {str(round(paper_roll_count, 2) if is_float_not_integer(paper_roll_count) else int(paper_roll_count))}")
-        self.packs_tape_rolls.setText(f"Tape Rolls: {str(round(tape_roll_count, 2) if is_float_not_integer(tape_roll_count) else int(tape_roll_count))}")
-        self.packs_labor_hours.setText(f"Labor Hours: {labor_count if is_float_not_integer(labor_count) else int(labor_count)}")
+        self.staff_table_model.set_packing_cost(packing_cost)
+
+        self.packs_small_boxes.setText(f"Small Boxes: {pricing.display_number(small_box_count)}")
+        self.packs_medium_boxes.setText(f"Medium Boxes: {pricing.display_number(medium_box_count)}")
+        self.packs_large_boxes.setText(f"Large Boxes: {pricing.display_number(large_box_count)}")
+        self.packs_paper_rolls.setText(f"Paper Rolls: {pricing.display_number(paper_roll_count)}")
+        self.packs_tape_rolls.setText(f"Tape Rolls: {pricing.display_number(tape_roll_count)}")
+        self.packs_labor_hours.setText(f"Labor Hours: {pricing.display_number(labor_count)}")
         self.packs_supply_resale_price.setText("")
         self.packs_total_packing_cost.setText("")
 
-        self.packs_small_boxes_2.setText(f"Small Boxes: {str(round(small_box_count, 2) if is_float_not_integer(small_box_count) else int(small_box_count))} (${round(small_box_cost, 2) if is_float_not_integer(small_box_cost) else int(small_box_cost)})")
-        self.packs_medium_boxes_2.setText(f"Medium Boxes: {str(round(medium_box_count, 2) if is_float_not_integer(medium_box_count) else int(medium_box_count))} (${round(medium_box_cost, 2) if is_float_not_integer(medium_box_cost) else int(medium_box_cost)})")
-        self.packs_large_boxes_2.setText(f"Large Boxes: {str(round(large_box_count, 2) if is_float_not_integer(large_box_count) else int(large_box_count))} (${round(large_box_cost, 2) if is_float_not_integer(large_box_cost) else int(large_box_cost)})")
-        self.packs_paper_rolls_2.setText(f"Paper Rolls: {str(round(paper_roll_count, 2) if is_float_not_integer(paper_roll_count) else int(paper_roll_count))} (${round(paper_roll_cost, 2) if is_float_not_integer(paper_roll_cost) else int(paper_roll_cost)})")
-        self.packs_tape_rolls_2.setText(f"Tape Rolls: {str(round(tape_roll_count, 2) if is_float_not_integer(tape_roll_count) else int(tape_roll_count))} (${round(tape_roll_cost, 2) if is_float_not_integer(tape_roll_cost) else int(tape_roll_cost)})")
-        self.packs_labor_hours_2.setText(f"Labor Hours: {labor_count if is_float_not_integer(labor_count) else int(labor_count)} (${round(labor_cost, 2) if is_float_not_integer(labor_cost) else int(labor_cost)})")
-        self.packs_total_packing_cost_2.setText(f"Total Packing Cost: ${round(total_packing_cost, 2) if is_float_not_integer(total_packing_cost) else int(total_packing_cost)}")
-        self.packs_supply_cost_2.setText(f"Total Supply Cost: ${round(total_supply_cost, 2) if is_float_not_integer(total_supply_cost) else int(total_supply_cost)}")
-        self.packs_supply_resale_price_2.setText(f"Total Supply Resell Price: ${round(total_packing_cost_without_labor, 2) if is_float_not_integer(total_packing_cost_without_labor) else int(total_packing_cost_without_labor)}")
-        self.packs_supply_profit_2.setText(f"Total Supply Material Profit: ${round(total_packing_cost_without_labor - total_supply_cost, 2) if is_float_not_integer(total_packing_cost_without_labor - total_supply_cost) else int(total_packing_cost_without_labor - total_supply_cost)}")
-
-        self.packing_cost_total = round(total_packing_cost, 2) if is_float_not_integer(total_packing_cost) else int(total_packing_cost)
-        self.packing_cost_label_2.setText(f"Packing Materials Cost: ${round(total_packing_cost_without_labor, 2) if is_float_not_integer(total_packing_cost_without_labor) else int(total_packing_cost_without_labor)}")
-        self.packing_total_label_2.setText(f"Packing Total Cost: ${round(total_packing_cost, 2) if is_float_not_integer(total_packing_cost) else int(total_packing_cost)}")
+        self.packs_small_boxes_2.setText(f"Small Boxes: {pricing.display_number(small_box_count)} (${pricing.display_number(small_box_cost)})")
+        self.packs_medium_boxes_2.setText(f"Medium Boxes: {pricing.display_number(medium_box_count)} (${pricing.display_number(medium_box_cost)})")
+        self.packs_large_boxes_2.setText(f"Large Boxes: {pricing.display_number(large_box_count)} (${pricing.display_number(large_box_cost)})")
+        self.packs_paper_rolls_2.setText(f"Paper Rolls: {pricing.display_number(paper_roll_count)} (${pricing.display_number(paper_roll_cost)})")
+        self.packs_tape_rolls_2.setText(f"Tape Rolls: {pricing.display_number(tape_roll_count)} (${pricing.display_number(tape_roll_cost)})")
+        self.packs_labor_hours_2.setText(f"Labor Hours: {pricing.display_number(labor_count)} (${pricing.display_number(labor_cost)})")
+        self.packs_total_packing_cost_2.setText(f"Total Packing Cost: ${pricing.display_number(total_packing_cost)}")
+        self.packs_supply_cost_2.setText(f"Total Supply Cost: ${pricing.display_number(total_supply_cost)}")
+        self.packs_supply_resale_price_2.setText(f"Total Supply Resell Price: ${pricing.display_number(total_packing_cost_without_labor)}")
+        self.packs_supply_profit_2.setText(f"Total Supply Material Profit: ${pricing.display_number(total_packing_cost_without_labor - total_supply_cost)}")
+
+        self.packing_cost_total = pricing.display_number(total_packing_cost)
+        self.packing_cost_label_2.setText(f"Packing Materials Cost: ${pricing.display_number(total_packing_cost_without_labor)}")
+        self.packing_total_label_2.setText(f"Packing Total Cost: ${pricing.display_number(total_packing_cost)}")
         self.moving_and_packing_total_cost.setText(f"Moving & Packing Total Cost: ${round(self.packing_cost_total + self.moving_cost_total, 2)}")
 
         self.is_packing_calculated = True
-        if self.packing_scroll_area.isVisible():
+        if self.packing_list.isVisible():
             self.packs_see_details_button.setText("See Details")
             self.packs_see_details_button.show()
         try:
@@ -2471,14 +2101,14 @@ class UI(QWidget):
             pass
         self.packs_see_details_button.clicked.connect(
             lambda: self.display_packs_details(
-                round(small_box_resell_price, 2) if is_float_not_integer(small_box_resell_price) else int(small_box_resell_price),
-                round(medium_box_resell_price, 2) if is_float_not_integer(medium_box_resell_price) else int(medium_box_resell_price),
-                round(large_box_resell_price, 2) if is_float_not_integer(large_box_resell_price) else int(large_box_resell_price),
-                round(paper_roll_resell_price, 2) if is_float_not_integer(paper_roll_resell_price) else int(paper_roll_resell_price),
-                round(tape_roll_resell_price, 2) if is_float_not_integer(tape_roll_resell_price) else int(tape_roll_resell_price),
-                f"Materials Cost: ${round(total_packing_cost_without_labor, 2) if is_float_not_integer(total_packing_cost_without_labor) else int(total_packing_cost_without_labor)}",
-                f"Total Packing Cost: ${round(total_packing_cost, 2) if is_float_not_integer(total_packing_cost) else int(total_packing_cost)}",
-                round(labor_cost, 2) if is_float_not_integer(labor_cost) else int(labor_cost),
+                pricing.display_number(small_box_resell_price),
+                pricing.display_number(medium_box_resell_price),
+                pricing.display_number(large_box_resell_price),
+                pricing.display_number(paper_roll_resell_price),
+                pricing.display_number(tape_roll_resell_price),
+                f"Materials Cost: ${pricing.display_number(total_packing_cost_without_labor)}",
+                f"Total Packing Cost: ${pricing.display_number(total_packing_cost)}",
+                pricing.display_number(labor_cost),
             )
         )
 
@@ -2515,6 +2145,15 @@ class UI(QWidget):
         self.packs_see_details_button.clicked.connect(lambda: self.display_packs_details(small_box_cost, medium_box_cost, large_box_cost, paper_roll_cost, tape_roll_cost, materials_cost_text, total_packing_cost_text, labor_cost))
 
     def edit_supply_costs(self):
+        self.run_in_background(self.fetch_supplies, self.show_edit_supply_costs)
+
+    def fetch_supplies(self):
+        conn = get_db_connection(self.is_online)
+        all_supplies = queries.fetch_all(conn, 'supplies')
+        conn.close()
+        return all_supplies
+
+    def show_edit_supply_costs(self, all_supplies):
         def change_edited_supply():
             name = choose_item_combobox.currentText()
             item_supplier.setEnabled(True)
@@ -2528,49 +2167,18 @@ class UI(QWidget):
                     item_resell_price.setText(str(convert_integer_or_leave_float(edited_item[4])))
 
         self.edit_supply_costs_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.edit_supply_costs_window.setWindowIcon(QIcon(resource_path("icons/edit.png")))
+        self.edit_supply_costs_window.setWindowIcon(resources.icon("edit.png"))
         layout = QGridLayout()
         self.edit_supply_costs_window.setLayout(layout)
         self.edit_supply_costs_window.setWindowTitle("Edit Packing Supply Materials")
-        self.edit_supply_costs_window.setStyleSheet("QDialog {"
-                                             "background-color: rgb(225, 235, 240);"
-                                             "min-width: 400px;}"
-                                             "QPushButton {"
-                                             "background-color: rgb(165, 209, 255);"
-                                             "border: 2px solid rgb(128, 179, 255);"
-                                             "border-radius: 5px;"
-                                             "padding: 2px 5px;}"
-                                             "QPushButton::hover {"
-                                             "background-color: rgb(128, 179, 255);}"
-                                             "QLineEdit {"
-                                             "border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox {border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox::drop-down {"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "border-radius: 3px;}"
-                                             "QComboBox::down-arrow {"
-                                             "image: url(icons/arrow.png);"
-                                             "width: 8px;"
-                                             "height: 8px;}"
-                                             "QComboBox QAbstractItemView {"
-                                             "background-color: rgb(250, 250, 250);}")
+        self.edit_supply_costs_window.setObjectName("wide_dialog")
+        self.edit_supply_costs_window.setStyleSheet(dialog_stylesheet)
         edit_supplies_widget = QWidget(self.edit_supply_costs_window)
         layout.addWidget(edit_supplies_widget)
         edit_supplies_layout = QGridLayout()
         edit_supplies_widget.setLayout(edit_supplies_layout)
-        # get latest info from database below
-        if not self.all_supplies:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('''SELECT * FROM supplies ORDER BY id ASC''')
-            self.all_supplies = cursor.fetchall()
-            conn.close()
+        # latest info from database was fetched in the background
+        self.all_supplies = all_supplies
         # define UI elements below
         choose_item_combobox = QComboBox()
         choose_item_combobox.setPlaceholderText(" ")
@@ -2607,36 +2215,33 @@ class UI(QWidget):
         edit_supplies_layout.addWidget(save_supply_button, 4, 1, 1, 1)
 
         for item in self.edit_supply_costs_window.findChildren(QLabel):
-            item.setFont(QFont('Times', 10))
+            item.setFont(resources.font(10))
         for item in self.edit_supply_costs_window.findChildren(QComboBox):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_supply_costs_window.findChildren(QLineEdit):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_supply_costs_window.findChildren(QPushButton):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         self.edit_supply_costs_window.show()
 
     def save_supply(self, supplier, order_price, resell_price, where):
         if order_price == '' or resell_price == '':
             return
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = f'''UPDATE supplies SET
-            supplier = '{supplier}',
-            order_price = {float(order_price)},
-            resell_price = {float(resell_price)}
-            WHERE supply_name = '{where}'
-        '''
-        cursor.execute(sql)
-        conn.commit()
-
-        sql = '''SELECT * FROM supplies ORDER BY supply_name ASC'''
-        cursor.execute(sql)
-        self.all_supplies = cursor.fetchall()
-        conn.close()
+        self.save_edit(edits.Edit('supplies', 'update', where, {'supplier': supplier, 'order_price': float(order_price),
+                                                                'resell_price': float(resell_price)}),
+                       self.reload_pricing_data)
         self.edit_supply_costs_window.close()
 
     def edit_room_materials(self):
+        self.run_in_background(self.fetch_rooms, self.show_edit_room_materials)
+
+    def fetch_rooms(self):
+        conn = get_db_connection(self.is_online)
+        all_rooms = queries.fetch_all(conn, 'rooms_by_name')
+        conn.close()
+        return all_rooms
+
+    def show_edit_room_materials(self, all_rooms):
         def change_edited_room():
             name = choose_item_combobox.currentText()
             room_name.setEnabled(True)
@@ -2668,49 +2273,20 @@ class UI(QWidget):
                         labors_quantity.setText(str(convert_integer_or_leave_float(edited_item[7])))
 
         self.edit_room_window = QDialog(None, Qt.WindowCloseButtonHint | Qt.WindowTitleHint)
-        self.edit_room_window.setWindowIcon(QIcon(resource_path("icons/edit.png")))
+        self.edit_room_window.setWindowIcon(resources.icon("edit.png"))
         layout = QGridLayout()
         self.edit_room_window.setLayout(layout)
         self.edit_room_window.setWindowTitle("Edit Packing Room Needs")
-        self.edit_room_window.setStyleSheet("QDialog {"
-                                             "background-color: rgb(225, 235, 240);"
-                                             "min-width: 400px;}"
-                                             "QPushButton {"
-                                             "background-color: rgb(165, 209, 255);"
-                                             "border: 2px solid rgb(128, 179, 255);"
-                                             "border-radius: 5px;"
-                                             "padding: 2px 5px;}"
-                                             "QPushButton::hover {"
-                                             "background-color: rgb(128, 179, 255);}"
-                                             "QLineEdit {"
-                                             "border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox {border: 1px solid rgb(128, 179, 255);"
-                                             "border-radius: 3px;"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "padding: 2px 2px;}"
-                                             "QComboBox::drop-down {"
-                                             "background-color: rgb(250, 250, 250);"
-                                             "border-radius: 3px;}"
-                                             "QComboBox::down-arrow {"
-                                             "image: url(icons/arrow.png);"
-                                             "width: 8px;"
-                                             "height: 8px;}"
-                                             "QComboBox QAbstractItemView {"
-                                             "background-color: rgb(250, 250, 250);}")
+        self.edit_room_window.setObjectName("wide_dialog")
+        self.edit_room_window.setStyleSheet(dialog_stylesheet)
         edit_room_widget = QWidget(self.edit_room_window)
         layout.addWidget(edit_room_widget)
         edit_room_layout = QGridLayout()
         edit_room_widget.setLayout(edit_room_layout)
-        # get latest info from database below
-        if not self.all_rooms:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('''SELECT * FROM rooms ORDER BY room_name ASC''')
-            self.all_rooms = cursor.fetchall()
-            conn.close()
+        # latest info from database was fetched in the background
+        if all_rooms != self.all_rooms:
+            self.apply_rooms(all_rooms)
+            self.reload_pricing_data()
         # define UI elements below
         choose_item_combobox = QComboBox()
         choose_item_combobox.setPlaceholderText(" ")
@@ -2778,68 +2354,243 @@ class UI(QWidget):
         edit_room_layout.addWidget(save_room_button, 8, 1, 1, 1)
 
         for item in self.edit_room_window.findChildren(QLabel):
-            item.setFont(QFont('Times', 10))
+            item.setFont(resources.font(10))
         for item in self.edit_room_window.findChildren(QComboBox):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_room_window.findChildren(QLineEdit):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         for item in self.edit_room_window.findChildren(QPushButton):
-            item.setFont(QFont('Times', 9))
+            item.setFont(resources.font(9))
         self.edit_room_window.show()
     
     def save_room(self, name, small, medium, large, paper, tape, labor, where):
         if small == '' or medium == '' or large == '' or paper == '' or tape == '' or labor == '':
             return
+        values = {'room_name': name, 'small_box_quantity': float(small), 'medium_box_quantity': float(medium),
+                  'large_box_quantity': float(large), 'paper_roll_quantity': float(paper),
+                  'tape_roll_quantity': float(tape), 'labor_hours': float(labor)}
+        # room rows are updated in place instead of read again; ids of new rooms aren't known here and aren't used
+        rooms = {row[1]: row for row in self.all_rooms}
         if where == "-- Add New Item --":
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            sql = f'''INSERT INTO rooms 
-                (room_name, small_box_quantity, medium_box_quantity, large_box_quantity, paper_roll_quantity,
-                tape_roll_quantity, labor_hours) VALUES 
-            ('{name}', {float(small)}, {float(medium)}, {float(large)}, {float(paper)}, {float(tape)}, {float(labor)})
-            '''
-            cursor.execute(sql)
-            conn.commit()
-            conn.close()
+            self.save_edit(edits.Edit('rooms', 'insert', None, values), self.reload_pricing_data)
+            rooms[name] = (None, *values.values())
+            change = (None, (name, "Packing"))
         else:
+            if where not in rooms:
+                # removed by a revalidation or a change from another computer while the dialog was open
+                QMessageBox.warning(self.edit_room_window, "Edit Packing Room Needs", f"{where} was deleted meanwhile.")
+                return
+            old_row = rooms.pop(where)
             if name == '':
-                conn = psycopg2.connect(DB_URL)
-                cursor = conn.cursor()
-                sql = f'''DELETE FROM rooms WHERE room_name = '{where}'
-                '''
-                cursor.execute(sql)
-                conn.commit()
-                conn.close()
+                self.save_edit(edits.Edit('rooms', 'delete', where, {}), self.reload_pricing_data)
+                change = ((where, "Packing"), None)
             else:
-                conn = psycopg2.connect(DB_URL)
-                cursor = conn.cursor()
-                sql = f'''UPDATE rooms SET
-                    room_name = '{name}',
-                    small_box_quantity = {float(small)},
-                    medium_box_quantity = {float(medium)},
-                    large_box_quantity = {float(large)},
-                    paper_roll_quantity = {float(paper)},
-                    tape_roll_quantity = {float(tape)},
-                    labor_hours = {float(labor)}
-                WHERE room_name = '{where}'
-                '''
-                cursor.execute(sql)
-                conn.commit()
-                conn.close()
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        sql = '''SELECT * FROM rooms ORDER BY room_name ASC'''
-        cursor.execute(sql)
-        # item list will hold all data of items inside a list
-        self.all_rooms = cursor.fetchall()
-        conn.close()
-        while self.i_room > 0:
-            self.packing_widget_layout.removeRow(0)
-            self.i_room -= 1
-        for item in self.all_rooms:
-            self.add_row(self.packing_widget_layout, item[1], "Packing")
+                self.save_edit(edits.Edit('rooms', 'update', where, values), self.reload_pricing_data)
+                rooms[name] = (old_row[0], *values.values())
+                change = ((where, "Packing"), (name, "Packing"))
+        self.all_rooms = sorted(rooms.values(), key=lambda row: row[1].casefold())
+        self.apply_row_changes([change])
         self.edit_room_window.close()
 
+    def save_edit(self, edit, on_saved=None):
+        # the dialogs already show the edit; it is written in the background and on_saved runs once it is written or
+        # queued offline
+        self.unsaved_edits.append((edit, on_saved))
+        if len(self.unsaved_edits) == 1:
+            self.write_edit()
+
+    def write_edit(self):
+        edit, on_saved = self.unsaved_edits[0]
+        if self.is_online:
+            self.run_in_background(lambda: self.apply_online_edit(edit), lambda result: self.finish_edit(),
+                                   self.fail_edit, cancellable=False)
+            return
+        self.queue_offline_edit(edit)
+        self.finish_edit()
+
+    def apply_online_edit(self, edit):
+        # runs on the worker pool
+        conn = online_pool.connect()
+        try:
+            db.apply_edit(conn, edit)
+        finally:
+            conn.close()
+
+    def queue_offline_edit(self, edit):
+        # edits made offline are applied to offline.db and replayed to the database once it is reachable again
+        sqlite_conn = offline_db.connect()
+        self.create_tables_if_not_exists(sqlite_conn.cursor())
+        offline_db.queue_edit(sqlite_conn, edit)
+        sqlite_conn.close()
+
+    def fail_edit(self, error):
+        if isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            # the database stopped answering; the edit is queued like any other offline edit
+            self.set_offline_mode(error)
+            self.queue_offline_edit(self.unsaved_edits[0][0])
+            self.finish_edit()
+            return
+        # the server refused the edit itself, so it isn't queued, the replay would only be refused again; the catalog
+        # is read again to undo what the dialog already showed
+        self.unsaved_edits.pop(0)
+        if isinstance(error, psycopg2.Error):
+            QMessageBox.warning(self, "Save Changes", f"The database didn't accept this change:\n{error}")
+            self.edits_refused = True
+        else:
+            self.show_task_error(error)
+        self.write_next_edit()
+
+    def finish_edit(self):
+        edit, on_saved = self.unsaved_edits.pop(0)
+        if on_saved is not None:
+            on_saved()
+        self.write_next_edit()
+
+    def write_next_edit(self):
+        if self.unsaved_edits:
+            self.write_edit()
+        elif self.edits_refused:
+            self.edits_refused = False
+            self.revalidate_cache()
+
+    def set_offline_mode(self, error):
+        # back to the local cache until a probe reaches the database again, which replays the outbox
+        self.is_online = False
+        self.is_online_label.setText("Offline Mode")
+        self.is_online_label.setToolTip(str(error))
+        self.sync_db_button.setEnabled(False)
+        self.stop_change_listener()
+        self.probe_timer.start()
+
+    def probe_database(self, quiet=False):
+        self.run_in_background(lambda: db.probe(DB_URL), self.set_online_mode,
+                               lambda error: self.set_online_mode(False), cancellable=False, quiet=quiet)
+
+    def set_online_mode(self, is_online):
+        if not is_online:
+            if not self.is_online:
+                self.probe_timer.start()
+            return
+        if self.is_online:
+            return
+        self.probe_timer.stop()
+        self.is_online = True
+        self.is_online_label.setText("Online Mode")
+        self.is_online_label.setToolTip("")
+        self.sync_db_button.setEnabled(True)
+        # edits queued offline go first, so the revalidation that follows already includes them
+        self.run_in_background(self.replay_outbox, self.finish_replay,
+                               lambda error: self.finish_replay([], error), cancellable=False)
+
+    def replay_outbox(self):
+        # runs on the worker pool
+        sqlite_conn = offline_db.connect()
+        entries = offline_db.pending_edits(sqlite_conn)
+        if not entries:
+            sqlite_conn.close()
+            return []
+        conn = online_pool.connect()
+        conflicts = db.replay_edits(conn, [(edit, base_version) for outbox_id, edit, base_version in entries])
+        conn.close()
+        with offline_db.BulkWriter(sqlite_conn) as writer:
+            writer.delete_ids("outbox", [outbox_id for outbox_id, edit, base_version in entries])
+            # rows added offline got local ids, so the tables they touched are read again in full
+            writer.delete_ids("sync_marks", {edit.table for outbox_id, edit, base_version in entries}, "table_name")
+        sqlite_conn.close()
+        return conflicts
+
+    def finish_replay(self, conflicts, error=None):
+        self.revalidate_cache()
+        self.watch_catalog_changes()
+        if error is not None:
+            # outbox is kept and replayed the next time the app goes online; set after the tasks above start, so
+            # their busy indicator doesn't replace it
+            self.show_task_error(error)
+        elif conflicts:
+            self.is_online_label.setText(f"Online Mode ({len(conflicts)} offline edit(s) skipped)")
+            self.is_online_label.setToolTip("Changed on the server while offline, or rejected by it:\n" +
+                                            "\n".join(f"{edit.table}: {edit.key or edits.row_name(edit)}"
+                                                       for edit in conflicts))
+
+    def revalidate_cache(self):
+        # window was built from offline.db, the database is read in the background and only differences are applied
+        self.run_in_background(self.sync_offline_db, self.apply_online_tables, cancellable=False)
+
+    def apply_items(self, all_items):
+        # bring the catalog and the item rows up to date with all_items; hidden value changes only touch the catalog,
+        # rows are only touched for items that were added, deleted or moved to another tab
+        online_items = {row[0]: row for row in all_items}
+        cached_items = {row[0]: row for row in self.catalog.rows()}
+        for name in cached_items.keys() - online_items.keys():
+            self.catalog.remove_item(name)
+        for name, row in online_items.items():
+            if cached_items.get(name) != row:
+                self.catalog.set_item(*row)
+        self.all_items = self.catalog.rows()
+        self.apply_row_changes([((name, cached_items[name][2]) if name in cached_items else None,
+                                 (name, online_items[name][2]) if name in online_items else None)
+                                for name in sorted(cached_items.keys() | online_items.keys())])
+
+    def apply_rooms(self, all_rooms):
+        # rows are only touched for rooms that were added or deleted
+        cached_rooms = {row[1] for row in self.all_rooms}
+        online_rooms = {row[1] for row in all_rooms}
+        self.apply_row_changes([((name, "Packing"), None) for name in sorted(cached_rooms - online_rooms)] +
+                               [(None, (name, "Packing")) for name in sorted(online_rooms - cached_rooms)])
+        self.all_rooms = all_rooms
+
+    def apply_online_tables(self, tables):
+        all_items, all_rooms = tables
+        self.apply_items(all_items)
+        self.apply_rooms(all_rooms)
+        if self.all_items and self.main_estimate_label.text().startswith("Error: You have to go online"):
+            self.main_estimate_label.setText("")
+        self.reload_pricing_data()
+
+    def watch_catalog_changes(self):
+        if not self.is_online:
+            return
+        self.run_in_background(lambda: db.listen(DB_URL, CATALOG_CHANNEL), self.start_change_listener,
+                               self.retry_change_listener, cancellable=False, quiet=True)
+
+    def retry_change_listener(self, error=None):
+        if error is not None:
+            logging.warning("Couldn't listen for catalog changes, retrying in %d s: %s",
+                            self.listen_retry_delay // 1000, error)
+        QTimer.singleShot(self.listen_retry_delay, self.watch_catalog_changes)
+        self.listen_retry_delay = min(self.listen_retry_delay * 2, 300000)
+
+    def start_change_listener(self, conn):
+        # the socket is watched by the event loop, so listening doesn't hold a worker thread
+        self.listen_retry_delay = 5000
+        self.listen_conn = conn
+        self.listen_notifier = QSocketNotifier(conn.fileno(), QSocketNotifier.Read, self)
+        self.listen_notifier.activated.connect(self.read_catalog_changes)
+
+    def stop_change_listener(self):
+        if self.listen_notifier is not None:
+            self.listen_notifier.setEnabled(False)
+            self.listen_notifier.deleteLater()
+            self.listen_notifier = None
+        if self.listen_conn is not None:
+            self.listen_conn.close()
+            self.listen_conn = None
+
+    def read_catalog_changes(self):
+        tables = db.read_notifications(self.listen_conn)
+        if tables is None:
+            # connection was lost, listen again after a while
+            self.stop_change_listener()
+            self.retry_change_listener()
+            return
+        self.changed_tables |= tables & SYNCED_TABLES.keys()
+        if self.changed_tables:
+            self.changes_timer.start()
+
+    def sync_changed_tables(self):
+        tables, self.changed_tables = self.changed_tables, set()
+        self.run_in_background(lambda: self.sync_offline_db(tables), self.apply_online_tables, cancellable=False)
+
     def grant_access_to_staff(self):
         input_key = self.staff_secret_key_line.text()
         if input_key != ADMIN_PW:
@@ -2860,34 +2611,38 @@ class UI(QWidget):
             self.sync_db_button.show()
     
     def sync_db(self):
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM items ORDER BY item_name ASC")
-        all_items = cursor.fetchall()
-        cursor.execute("SELECT * FROM formulas ORDER BY id")
-        all_formulas = cursor.fetchall()
-        cursor.execute("SELECT * FROM supplies ORDER BY supply_name ASC")
-        all_supplies = cursor.fetchall()
-        cursor.execute("SELECT * FROM rooms ORDER BY room_name ASC")
-        all_rooms = cursor.fetchall()
-
-        conn.close()
+        self.run_in_background(self.sync_offline_db, self.finish_sync_db)
 
-        sqlite_conn = sqlite3.connect("offline.db")
+    def sync_offline_db(self, tables=SYNCED_TABLES):
+        # runs on the worker pool: only rows changed since the last sync are pulled into offline.db
+        sqlite_conn = offline_db.connect()
         sqlite_cursor = sqlite_conn.cursor()
-
         self.create_tables_if_not_exists(sqlite_cursor)
-        self.delete_existing_records(sqlite_cursor)
+        sqlite_cursor.execute("SELECT table_name, row_version FROM sync_marks")
+        marks = dict(sqlite_cursor.fetchall())
 
-        self.insert_records(sqlite_cursor, "items", all_items)
-        self.insert_records(sqlite_cursor, "formulas", all_formulas)
-        self.insert_records(sqlite_cursor, "supplies", all_supplies)
-        self.insert_records(sqlite_cursor, "rooms", all_rooms)
+        conn = online_pool.connect()
+        changes = db.fetch_changes(conn, {table: SYNCED_TABLES[table] for table in tables}, marks)
+        conn.close()
+
+        with offline_db.BulkWriter(sqlite_conn) as writer:
+            for table, (rows, deleted_ids, mark) in changes.items():
+                # deleted_ids is None when the whole table is replaced
+                if deleted_ids is None:
+                    writer.clear(table)
+                else:
+                    writer.delete_ids(table, deleted_ids)
+                writer.insert(table, SYNCED_TABLES[table], rows, replace=True)
+            writer.insert("sync_marks", ("table_name", "row_version"),
+                          [(table, mark) for table, (rows, deleted_ids, mark) in changes.items()], replace=True)
 
-        sqlite_conn.commit()
+        all_items = queries.fetch_all(sqlite_conn, 'items')
+        all_rooms = queries.fetch_all(sqlite_conn, 'rooms_by_name')
         sqlite_conn.close()
+        return all_items, all_rooms
 
+    def finish_sync_db(self, tables):
+        self.apply_online_tables(tables)
         self.db_synced_window.show()
 
     def create_tables_if_not_exists(self, cursor):
@@ -2922,6 +2677,15 @@ class UI(QWidget):
                 paper_roll_quantity REAL NOT NULL,
                 tape_roll_quantity REAL NOT NULL,
                 labor_hours REAL NOT NULL);""")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_marks (
+                table_name TEXT PRIMARY KEY,
+                row_version INTEGER NOT NULL);""")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS items_item_name ON items (item_name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS items_item_tab ON items (item_tab)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS rooms_room_name ON rooms (room_name)")
     
     def create_selected_items_table(self, cursor):
         cursor.execute("""
@@ -2935,124 +2699,27 @@ class UI(QWidget):
     def delete_existing_selected_items_records(self, cursor):
         cursor.execute("DELETE FROM selected_items")
 
-    def delete_existing_records(self, cursor):
-        cursor.execute("DELETE FROM items")
-        cursor.execute("DELETE FROM formulas")
-        cursor.execute("DELETE FROM supplies")
-        cursor.execute("DELETE FROM rooms")
-
-    def insert_records(self, cursor, table, data):
-        for row in data:
-            placeholders = ', '.join(['?' for _ in row])
-            cursor.execute(f"INSERT INTO {table} VALUES ({placeholders})", row)
-
     def closeEvent(self, event):
-        sqlite_conn = sqlite3.connect("offline.db")
+        self.stop_change_listener()
+        sqlite_conn = offline_db.connect()
         sqlite_cursor = sqlite_conn.cursor()
         self.create_selected_items_table(sqlite_cursor)
-        self.delete_existing_selected_items_records(sqlite_cursor)
-
-        item_list_kitchen = []
-        item_list_bedroom = []
-        item_list_living = []
-        item_list_outside = []
-        item_list_office = []
-        item_list_boxes = []
-        number_list_kitchen = []
-        number_list_bedroom = []
-        number_list_living = []
-        number_list_outside = []
-        number_list_office = []
-        number_list_boxes = []
-
-        # get names as a list
-        for item in self.kitchen_widget.findChildren(QLabel):
-            item_list_kitchen.append(item.text())
-        for item in self.bedroom_widget.findChildren(QLabel):
-            item_list_bedroom.append(item.text())
-        for item in self.living_widget.findChildren(QLabel):
-            item_list_living.append(item.text())
-        for item in self.outside_widget.findChildren(QLabel):
-            item_list_outside.append(item.text())
-        for item in self.office_widget.findChildren(QLabel):
-            item_list_office.append(item.text())
-        for item in self.boxes_widget.findChildren(QLabel):
-            item_list_boxes.append(item.text())
-
-        # get numbers as a list
-        for item in self.kitchen_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_kitchen.append(item.text())
-            else:
-                number_list_kitchen.append('0')
-        for item in self.bedroom_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_bedroom.append(item.text())
-            else:
-                number_list_bedroom.append('0')
-        for item in self.living_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_living.append(item.text())
-            else:
-                number_list_living.append('0')
-        for item in self.outside_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_outside.append(item.text())
-            else:
-                number_list_outside.append('0')
-        for item in self.office_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_office.append(item.text())
-            else:
-                number_list_office.append('0')
-        for item in self.boxes_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                number_list_boxes.append(item.text())
-            else:
-                number_list_boxes.append('0')
-
-        for i in range(len(item_list_kitchen)):
-            if not number_list_kitchen[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_kitchen[i]}', 'move', 'kitchen', {number_list_kitchen[i]})")
-        for i in range(len(item_list_bedroom)):
-            if not number_list_bedroom[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_bedroom[i]}', 'move', 'bedroom', {number_list_bedroom[i]})")
-        for i in range(len(item_list_living)):
-            if not number_list_living[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_living[i]}', 'move', 'living', {number_list_living[i]})")
-        for i in range(len(item_list_outside)):
-            if not number_list_outside[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_outside[i]}', 'move', 'outside', {number_list_outside[i]})")
-        for i in range(len(item_list_office)):
-            if not number_list_office[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_office[i]}', 'move', 'office', {number_list_office[i]})")
-        for i in range(len(item_list_boxes)):
-            if not number_list_boxes[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{item_list_boxes[i]}', 'move', 'boxes', {number_list_boxes[i]})")
-
-
-        pack_item_list = []
-        pack_number_list = []
-        # get names as a list
-        for item in self.packing_widget.findChildren(QLabel):
-            pack_item_list.append(item.text())
-        # get numbers as a list
-        for item in self.packing_widget.findChildren(QLineEdit):
-            if not item.text() == '':
-                pack_number_list.append(item.text())
-            else:
-                pack_number_list.append('0')
-        for i in range(len(pack_item_list)):
-            if not pack_number_list[i] == '0':
-                sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{pack_item_list[i]}', 'pack', null, {pack_number_list[i]})")
-        
-        sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{self.client_name_input.text()}', 'client', null, 0)")
-        sqlite_cursor.execute(f"INSERT INTO selected_items (name, type, item_tab, count) VALUES ('{self.address_input.text()}', 'address', null, 0)")
 
-        sqlite_conn.commit()
+        # selected counts of every tab, packing rooms, then customer name and address
+        selected_items = []
+        for tab, item_tab in [('Kitchen', 'kitchen'), ('Bedroom', 'bedroom'), ('Living Room', 'living'),
+                              ('Outside', 'outside'), ('Office', 'office'), ('Boxes', 'boxes'), ('Packing', None)]:
+            for name, count in self.count_models[tab].items():
+                if count:
+                    selected_items.append((name, 'move' if item_tab else 'pack', item_tab, count))
+        selected_items.append((self.client_name_input.text(), 'client', None, 0))
+        selected_items.append((self.address_input.text(), 'address', None, 0))
+
+        with offline_db.BulkWriter(sqlite_conn) as writer:
+            self.delete_existing_selected_items_records(writer.cursor)
+            writer.insert("selected_items", ("name", "type", "item_tab", "count"), selected_items)
         sqlite_conn.close()
 
-
 app = QApplication(sys.argv)
 UIWindow = UI()
 UIWindow.show()
@@ -0,0 +1,236 @@
+"""Item and room lists backed by a model: each row is just a name and a count until it is painted, and the minus,
+count and plus controls are drawn by a delegate instead of being widgets, so only rows on screen cost anything."""
+import bisect
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QEvent, QRect, QRectF, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QFontMetrics, QPen
+from PyQt5.QtWidgets import QStyledItemDelegate, QLineEdit, QListView, QAbstractItemView
+
+COUNT_ROLE = Qt.UserRole
+BORDER_COLOR = QColor(128, 179, 255)
+COUNT_BACKGROUND = QColor(250, 250, 250)
+
+
+def to_count(value):
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+class CountListModel(QAbstractListModel):
+    """Names in display order with the count entered for each; count_changed follows every count edit.
+
+    Rows are kept in case-insensitive name order, the order Catalog.rows gives, so a name added later lands where
+    a reload would put it. rows maps each name to its row, so a row is found by name without searching the list.
+    """
+    count_changed = pyqtSignal(str, int)
+
+    def __init__(self, names=(), parent=None):
+        super().__init__(parent)
+        self.names = sorted(names, key=str.casefold)
+        # casefolded names, what insert_name bisects
+        self.keys = [name.casefold() for name in self.names]
+        self.counts = [0] * len(self.names)
+        self.rows = {}
+        self.index_rows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.names[index.row()]
+        if role in (Qt.EditRole, COUNT_ROLE):
+            return self.counts[index.row()]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role not in (Qt.EditRole, COUNT_ROLE):
+            return False
+        row = index.row()
+        if self.counts[row] != value:
+            self.counts[row] = value
+            self.dataChanged.emit(index, index, [COUNT_ROLE])
+            self.count_changed.emit(self.names[row], value)
+        return True
+
+    def reset(self, names):
+        """Replace every row with names, all counted 0."""
+        self.beginResetModel()
+        self.names = sorted(names, key=str.casefold)
+        self.keys = [name.casefold() for name in self.names]
+        self.counts = [0] * len(self.names)
+        self.rows = {}
+        self.index_rows()
+        self.endResetModel()
+
+    def index_rows(self, start=0):
+        # rows after an inserted or removed one shift by one, the ones before keep their entries
+        for row in range(start, len(self.names)):
+            self.rows[self.names[row]] = row
+
+    def row_of(self, name):
+        return self.rows.get(name, -1)
+
+    def count(self, name):
+        row = self.row_of(name)
+        return self.counts[row] if row >= 0 else None
+
+    def set_count(self, name, count):
+        row = self.row_of(name)
+        if row < 0:
+            return False
+        return self.setData(self.index(row), count)
+
+    def items(self):
+        """(name, count) for every row, in display order."""
+        return list(zip(self.names, self.counts))
+
+    def clear_counts(self):
+        for row, count in enumerate(self.counts):
+            if count:
+                self.setData(self.index(row), 0)
+
+    def insert_name(self, name, count=0):
+        row = bisect.bisect_right(self.keys, name.casefold())
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.insert(row, name)
+        self.keys.insert(row, name.casefold())
+        self.counts.insert(row, 0)
+        self.index_rows(row)
+        self.endInsertRows()
+        if count:
+            self.setData(self.index(row), count)
+
+    def remove_name(self, name):
+        """Remove a row and return the count it had."""
+        row = self.row_of(name)
+        if row < 0:
+            return 0
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.names.pop(row)
+        self.keys.pop(row)
+        count = self.counts.pop(row)
+        del self.rows[name]
+        self.index_rows(row)
+        self.endRemoveRows()
+        return count
+
+
+class CountDelegate(QStyledItemDelegate):
+    """Paints a row as a framed name with minus, count and plus controls and handles clicks on them.
+
+    The count is edited in a QLineEdit that only exists while that row is being edited.
+    """
+    BUTTON_SIZE = 22
+    COUNT_WIDTH = 40
+    SPACING = 10
+    MARGIN = 2
+
+    def __init__(self, minus_icon, plus_icon, font, validator, parent=None):
+        super().__init__(parent)
+        self.minus_icon = minus_icon
+        self.plus_icon = plus_icon
+        self.font = font
+        self.validator = validator
+        self.row_height = QFontMetrics(font).height() + 24
+
+    def control_rects(self, rect):
+        """Rects of the row frame, name, minus button, count box and plus button within rect."""
+        frame = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        middle = frame.center().y()
+        plus = QRect(frame.right() - self.SPACING - self.BUTTON_SIZE, middle - self.BUTTON_SIZE // 2,
+                     self.BUTTON_SIZE, self.BUTTON_SIZE)
+        count = QRect(plus.left() - self.SPACING - self.COUNT_WIDTH, middle - self.BUTTON_SIZE // 2,
+                      self.COUNT_WIDTH, self.BUTTON_SIZE)
+        minus = QRect(count.left() - self.SPACING - self.BUTTON_SIZE, middle - self.BUTTON_SIZE // 2,
+                      self.BUTTON_SIZE, self.BUTTON_SIZE)
+        name = QRect(frame.left() + self.SPACING, frame.top(), minus.left() - frame.left() - 2 * self.SPACING,
+                     frame.height())
+        return frame, name, minus, count, plus
+
+    def width_for(self, names):
+        """Row width that fits the longest of names next to the controls."""
+        metrics = QFontMetrics(self.font)
+        name_width = max([10] + [metrics.horizontalAdvance(name) for name in names])
+        return name_width + 2 * self.BUTTON_SIZE + self.COUNT_WIDTH + 5 * self.SPACING + 2 * self.MARGIN
+
+    def sizeHint(self, option, index):
+        # rows stretch to the width of the list, only their height is fixed
+        return QSize(0, self.row_height)
+
+    def paint(self, painter, option, index):
+        frame, name, minus, count, plus = self.control_rects(option.rect)
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        painter.setFont(self.font)
+        painter.setPen(QPen(BORDER_COLOR))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(frame), 3, 3)
+        painter.setBrush(COUNT_BACKGROUND)
+        painter.drawRoundedRect(QRectF(count), 3, 3)
+        painter.setPen(option.palette.color(option.palette.Text))
+        text = index.data(Qt.DisplayRole)
+        painter.drawText(name, Qt.AlignLeft | Qt.AlignVCenter,
+                         QFontMetrics(self.font).elidedText(text, Qt.ElideRight, name.width()))
+        painter.drawText(count.adjusted(4, 0, -4, 0), Qt.AlignLeft | Qt.AlignVCenter, str(index.data(COUNT_ROLE)))
+        self.minus_icon.paint(painter, minus.adjusted(3, 3, -3, -3))
+        self.plus_icon.paint(painter, plus.adjusted(3, 3, -3, -3))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            frame, name, minus, count, plus = self.control_rects(option.rect)
+            if minus.contains(event.pos()):
+                model.setData(index, max(index.data(COUNT_ROLE) - 1, 0))
+                return True
+            if plus.contains(event.pos()):
+                model.setData(index, index.data(COUNT_ROLE) + 1)
+                return True
+            if count.contains(event.pos()) and isinstance(option.widget, QAbstractItemView):
+                option.widget.edit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setFont(self.font)
+        editor.setValidator(self.validator)
+        editor.setStyleSheet("background-color: rgb(250, 250, 250);"
+                             "border: 1px solid rgb(128, 179, 255);"
+                             "border-radius: 3px;")
+        # counts follow every keystroke, like the live estimate expects
+        editor.textChanged.connect(lambda text: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        # the view calls this again after each commit; leave what is being typed alone so the cursor doesn't jump
+        if not editor.isModified() or to_count(editor.text()) != index.data(COUNT_ROLE):
+            editor.setText(str(index.data(COUNT_ROLE)))
+            editor.selectAll()
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, to_count(editor.text()))
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(self.control_rects(option.rect)[3])
+
+
+class CountListView(QListView):
+    """List of CountListModel rows; all rows have the delegate's height, so Qt never measures them one by one."""
+
+    def __init__(self, model, delegate, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(delegate)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
@@ -0,0 +1,304 @@
+"""Access to the hosted Postgres database: pooled connections, so admin actions skip the TLS handshake on every
+click, a quick reachability probe, the single round trip catalog reads startup and sync_db use, catalog edits and
+their replay from the offline outbox and the listening connection that tells clients when the catalog changed."""
+import socket
+import threading
+import time
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+import edits
+import queries
+
+
+class PooledConnection:
+    """psycopg2 connection whose close() hands it back to the pool instead of closing it."""
+    conn = None
+
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def close(self):
+        if self.conn is not None:
+            self.pool.release(self.conn)
+            self.conn = None
+
+    def __del__(self):
+        # a connection dropped without close() still goes back to the pool
+        self.close()
+
+
+class ConnectionPool:
+    """Keeps a few idle connections open and checks them before handing them out again.
+
+    Connections idle for less than check_after seconds are handed out as they are, older ones are pinged first and
+    ones idle for more than idle_timeout seconds are reconnected, since the hosted database drops idle sessions.
+    """
+
+    def __init__(self, dsn, max_idle=4, check_after=30, idle_timeout=240, connect_timeout=5):
+        self.dsn = dsn
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def connect(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                conn, returned_at = self.idle.pop()
+            if self.is_healthy(conn, time.monotonic() - returned_at):
+                return PooledConnection(self, conn)
+            self.discard(conn)
+        conn = psycopg2.connect(self.dsn, connect_timeout=self.connect_timeout,
+                                connection_factory=queries.PreparedConnection)
+        return PooledConnection(self, conn)
+
+    def is_healthy(self, conn, idle_for):
+        if conn.closed or idle_for > self.idle_timeout:
+            return False
+        if idle_for < self.check_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''SELECT 1''')
+            cursor.close()
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def release(self, conn):
+        if conn.closed:
+            return
+        status = conn.info.transaction_status
+        if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            self.discard(conn)
+            return
+        if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            # uncommitted work is never shared with the next user of the connection
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                self.discard(conn)
+                return
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append((conn, time.monotonic()))
+                return
+        self.discard(conn)
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn, returned_at in idle:
+            self.discard(conn)
+
+
+def probe(dsn, timeout=2):
+    """Check that the database server accepts connections, without the TLS handshake and login of a real connect."""
+    try:
+        params = psycopg2.extensions.parse_dsn(dsn)
+    except psycopg2.ProgrammingError:
+        return False
+    host = params.get('host', '').split(',')[0]
+    port = int(params.get('port', '5432').split(',')[0])
+    if not host:
+        return False
+    try:
+        if host.startswith('/'):
+            # a directory means a local unix socket, like libpq treats it
+            with socket.socket(socket.AF_UNIX) as sock:
+                sock.settimeout(timeout)
+                sock.connect(f"{host}/.s.PGSQL.{port}")
+        else:
+            socket.create_connection((host, port), timeout=timeout).close()
+    except OSError:
+        return False
+    return True
+
+
+def snapshot_query(tables, marks=None):
+    """Build one statement that returns every table as a JSON object, so the whole read is a single round trip.
+
+    Returns a name for the statement, its SQL and its parameters; the SQL only depends on the tables and on whether
+    marks are given, so it is prepared once per connection.
+
+    Without marks each table comes back as a list of rows ordered by id. With marks each table comes back as
+    {"rows": ..., "deleted": ...} holding only rows and the ids of tombstones stamped at or after its mark, next to
+    snapshot_xmin, the oldest transaction still running, and deleted_horizon, the newest pruned tombstone stamp.
+    """
+    fields = []
+    params = []
+    for table, columns in tables.items():
+        if marks is None:
+            fields.append(f"""'{table}', (SELECT coalesce(json_agg(json_build_array({', '.join(columns)}) ORDER BY id),
+                '[]') FROM {table})""")
+            continue
+        mark = marks.get(table, 0)
+        fields.append(f"""'{table}', json_build_object(
+            'rows', (SELECT coalesce(json_agg(json_build_array({', '.join(columns)})), '[]')
+                FROM {table} WHERE row_version >= %s),
+            'deleted', (SELECT coalesce(json_agg(row_id), '[]')
+                FROM deleted_rows WHERE table_name = %s AND row_version >= %s))""")
+        params += [mark, table, mark]
+    if marks is not None:
+        fields.append("""'snapshot_xmin', txid_snapshot_xmin(txid_current_snapshot()),
+            'deleted_horizon', (SELECT row_version FROM deleted_rows_horizon)""")
+    name = ('changes_' if marks is not None else 'tables_') + '_'.join(tables)
+    return name, f"""SELECT json_build_object({', '.join(fields)})""", params
+
+
+def fetch_snapshot(conn, name, query, params):
+    # a single statement already reads from one snapshot, so it runs in autocommit mode and psycopg2 doesn't spend
+    # extra round trips on BEGIN and ROLLBACK around it
+    conn.set_session(autocommit=True)
+    try:
+        cursor = queries.execute(conn, query, params, name)
+        snapshot = cursor.fetchone()[0]
+        cursor.close()
+        return snapshot
+    finally:
+        conn.set_session(autocommit=False)
+
+
+def fetch_tables(conn, tables):
+    """Read whole tables in one round trip; tables maps a table name to the columns to read."""
+    snapshot = fetch_snapshot(conn, *snapshot_query(tables))
+    return {table: [tuple(row) for row in snapshot[table]] for table in tables}
+
+
+def fetch_changes(conn, tables, marks):
+    """Read what changed in each table since the marks a client took at its last sync.
+
+    Rows are stamped with the transaction that last wrote them (see scripts/add_row_versions.py) and a mark is the
+    oldest transaction still running at the time of a sync, so rows stamped at or after the mark are the ones the
+    client may not have seen; a transaction that was still running then is read again rather than missed.
+
+    tables maps a table name to the columns to read and marks maps a table name to its mark. Returns
+    {table: (rows, deleted_ids, new_mark)}; deleted_ids is None when the client has to replace the whole table, either
+    because it has no mark yet, because the tombstones it would need were pruned, or because the database has no row
+    versions, in which case new_mark is 0 too. All tables are read in one round trip, unless some have to be read whole.
+    """
+    try:
+        snapshot = fetch_snapshot(conn, *snapshot_query(tables, marks))
+    except (psycopg2.errors.UndefinedColumn, psycopg2.errors.UndefinedTable):
+        return {table: (rows, None, 0) for table, rows in fetch_tables(conn, tables).items()}
+    new_mark = snapshot['snapshot_xmin']
+    # a mark at or before the newest pruned tombstone misses deletes, and one ahead of the server (a database restored
+    # from a backup) misses everything written since; those tables are read whole
+    stale = {table: columns for table, columns in tables.items()
+             if marks.get(table, 0) and not snapshot['deleted_horizon'] < marks[table] <= new_mark}
+    whole = fetch_tables(conn, stale) if stale else {}
+    changes = {}
+    for table in tables:
+        if table in whole:
+            changes[table] = (whole[table], None, new_mark)
+            continue
+        rows = snapshot[table]['rows']
+        deleted = snapshot[table]['deleted'] if marks.get(table, 0) else None
+        changes[table] = ([tuple(row) for row in rows], deleted, new_mark)
+    return changes
+
+
+def apply_edit(conn, edit):
+    queries.execute(conn, *edits.statement(edit)).close()
+    conn.commit()
+
+
+def replay_edits(conn, entries):
+    """Apply edits kept in the offline outbox in one transaction, skipping the ones that conflict with the server.
+
+    entries are (edit, base_version) pairs in the order the edits were made, base_version being the table's sync mark
+    at the time, or None when it isn't known. An update or delete conflicts when its row was changed on the server
+    since that sync, an update also when the row is gone, and an insert when the name is already taken. Rows written
+    earlier in the same replay are not checked again. An edit the server rejects, like a value of the wrong type, is
+    skipped as well; nothing is written if the connection fails. Returns the skipped edits.
+    """
+    written = set()
+    conflicts = []
+    try:
+        for edit, base_version in entries:
+            key_column = edits.KEY_COLUMNS[edit.table]
+            name = edit.key if edit.action != 'insert' else edits.row_name(edit)
+            sql = f'''SELECT * FROM {edit.table} WHERE {key_column} = %s FOR UPDATE'''
+            cursor = queries.execute(conn, sql, (name,), f'lock_{edit.table}')
+            row = cursor.fetchone()
+            columns = [column.name for column in cursor.description]
+            cursor.close()
+            if (edit.table, name) in written:
+                conflict = False
+            elif edit.action == 'insert':
+                conflict = row is not None
+            elif row is None:
+                # deleting a row that is already gone is not a conflict, there is just nothing left to do
+                conflict = edit.action == 'update'
+                if not conflict:
+                    continue
+            else:
+                # a row stamped at or after the mark was written by a transaction that hadn't finished at that sync;
+                # databases without row versions (see scripts/add_row_versions.py) and edits without a base version
+                # only get the checks above
+                conflict = base_version is not None and 'row_version' in columns and \
+                    row[columns.index('row_version')] >= base_version
+            if conflict:
+                conflicts.append(edit)
+                continue
+            # a savepoint per edit, so one the server rejects doesn't take the others down with it
+            savepoint = conn.cursor()
+            savepoint.execute('''SAVEPOINT replay_edit''')
+            try:
+                queries.execute(conn, *edits.statement(edit)).close()
+            except (psycopg2.DataError, psycopg2.IntegrityError):
+                savepoint.execute('''ROLLBACK TO SAVEPOINT replay_edit''')
+                savepoint.close()
+                conflicts.append(edit)
+                continue
+            savepoint.close()
+            written.add((edit.table, edits.row_name(edit)))
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    return conflicts
+
+
+def listen(dsn, channel, connect_timeout=5):
+    """Open a dedicated connection that LISTENs on channel, kept out of the pool since it stays open for good.
+
+    Keepalives make a connection dropped by the server or the network show up as readable, so the caller notices.
+    """
+    conn = psycopg2.connect(dsn, connect_timeout=connect_timeout, keepalives=1, keepalives_idle=60,
+                            keepalives_interval=10, keepalives_count=3)
+    conn.set_session(autocommit=True)
+    cursor = conn.cursor()
+    cursor.execute(f'''LISTEN {channel}''')
+    cursor.close()
+    return conn
+
+
+def read_notifications(conn):
+    """Return the set of payloads that arrived on a listening connection, or None once the connection is lost."""
+    try:
+        conn.poll()
+    except psycopg2.Error:
+        conn.close()
+        return None
+    payloads = {notify.payload for notify in conn.notifies}
+    conn.notifies.clear()
+    return payloads
@@ -0,0 +1,37 @@
+"""Catalog edits made from the admin dialogs, as data, so the same edit can be written to the database right away or
+kept in the offline.db outbox and replayed later."""
+from collections import namedtuple
+
+# rows are looked up by name in the dialogs, never by id
+KEY_COLUMNS = {
+    'items': 'item_name',
+    'formulas': 'formula_name',
+    'supplies': 'supply_name',
+    'rooms': 'room_name',
+}
+
+# action is 'insert', 'update' or 'delete'; key is the name of the row an update or delete targets and values maps
+# columns to the values written
+Edit = namedtuple('Edit', ['table', 'action', 'key', 'values'])
+
+
+def row_name(edit):
+    """Name of the row once the edit is applied."""
+    return edit.values.get(KEY_COLUMNS[edit.table], edit.key)
+
+
+def statement(edit):
+    """Parameterized SQL and parameters for an edit, to run with queries.execute."""
+    key_column = KEY_COLUMNS[edit.table]
+    columns = list(edit.values)
+    params = list(edit.values.values())
+    if edit.action == 'insert':
+        sql = f"INSERT INTO {edit.table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    elif edit.action == 'update':
+        assignments = ', '.join(f"{column} = %s" for column in columns)
+        sql = f"UPDATE {edit.table} SET {assignments} WHERE {key_column} = %s"
+        params.append(edit.key)
+    else:
+        sql = f"DELETE FROM {edit.table} WHERE {key_column} = %s"
+        params = [edit.key]
+    return sql, params
@@ -0,0 +1,92 @@
+"""The local SQLite cache (offline.db): WAL journaling, bulk writes done in one transaction and the outbox that keeps
+catalog edits made offline."""
+import json
+import sqlite3
+
+import edits
+import queries
+
+DB_PATH = "offline.db"
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path)
+    # with WAL, reading the cache (startup, offline pricing) doesn't wait for a sync that is writing it
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class BulkWriter:
+    """Writes many rows with executemany inside one explicit transaction.
+
+    synchronous is relaxed to NORMAL for the duration, which is still safe against corruption under WAL, and restored
+    afterwards. The transaction is committed when the with block ends and rolled back if it raises.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.synchronous = None
+
+    def __enter__(self):
+        self.synchronous = self.cursor.execute("PRAGMA synchronous").fetchone()[0]
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.cursor.execute(f"PRAGMA synchronous={self.synchronous}")
+        return False
+
+    def clear(self, table):
+        self.cursor.execute(f"DELETE FROM {table}")
+
+    def delete_ids(self, table, ids, column="id"):
+        self.cursor.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(row_id,) for row_id in ids])
+
+    def insert(self, table, columns, rows, replace=False):
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        self.cursor.executemany(f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                rows)
+
+
+def create_outbox_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            action TEXT NOT NULL,
+            row_key TEXT,
+            row_values TEXT NOT NULL,
+            base_version INTEGER);""")
+
+
+def queue_edit(conn, edit):
+    """Apply an edit to the cache and keep it in the outbox until it is replayed to the database.
+
+    The table's sync mark is stored with the edit, so the replay can tell whether the row changed on the server since.
+    Without a mark, as in an offline.db synced by an older version, base_version is NULL and the replay can't tell.
+    """
+    cursor = conn.cursor()
+    create_outbox_table(cursor)
+    with conn:
+        mark = cursor.execute("SELECT row_version FROM sync_marks WHERE table_name = ?", (edit.table,)).fetchone()
+        cursor.execute("""INSERT INTO outbox (table_name, action, row_key, row_values, base_version)
+            VALUES (?, ?, ?, ?, ?)""",
+                       (edit.table, edit.action, edit.key, json.dumps(edit.values), mark[0] if mark else None))
+        queries.execute(conn, *edits.statement(edit))
+    cursor.close()
+
+
+def pending_edits(conn):
+    """Edits waiting in the outbox, oldest first, as (outbox id, edit, base_version); base_version may be None."""
+    cursor = conn.cursor()
+    create_outbox_table(cursor)
+    cursor.execute("SELECT id, table_name, action, row_key, row_values, base_version FROM outbox ORDER BY id")
+    entries = [(row[0], edits.Edit(row[1], row[2], row[3], json.loads(row[4])), row[5]) for row in cursor.fetchall()]
+    cursor.close()
+    return entries
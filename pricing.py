@@ -0,0 +1,405 @@
+"""Moving estimate and packing cost math, kept free of Qt so quotes can be priced from scripts and services."""
+import itertools
+from collections import namedtuple, OrderedDict
+
+import numpy
+
+# every catalog, formula table and packing catalog state gets a version no other state will ever reuse
+versions = itertools.count(1)
+
+
+class MovingEstimate(namedtuple('MovingEstimate', [
+    'base_score', 'distance_addition', 'long_distance_addition', 'fort_riley_addition', 'second_truck_addition',
+    'small_addition', 'med_addition', 'large_addition', 'estimator_addition', 'adjust', 'scale', 'final_value',
+    'unload_only_final', 'load_only_final', 'counted_items'])):
+    """Full breakdown of one moving estimate."""
+    __slots__ = ()
+
+    @property
+    def total_before_adjust(self):
+        """Sum of the base score and every addition, before the adjust rate is applied."""
+        return self.base_score + self.distance_addition + self.long_distance_addition + self.fort_riley_addition +\
+            self.second_truck_addition + self.small_addition + self.med_addition + self.large_addition +\
+            self.estimator_addition
+
+
+class PackingCost(namedtuple('PackingCost', [
+    'material_counts', 'labor_hours', 'supply_costs', 'resell_prices', 'labor_cost', 'scale', 'counted_rooms'])):
+    """Packing needs and prices of one job.
+
+    material_counts, supply_costs and resell_prices follow the order of PACKING_SUPPLIES.
+    """
+    __slots__ = ()
+
+    @property
+    def all_materials_count(self):
+        return sum(self.material_counts)
+
+    @property
+    def total_supply_cost(self):
+        return sum(self.supply_costs)
+
+    @property
+    def total_resell_price(self):
+        return sum(self.resell_prices)
+
+    @property
+    def total_packing_cost(self):
+        return self.total_resell_price + self.labor_cost
+
+
+# supplies used by the room material columns, in the same order as the rooms table columns
+PACKING_SUPPLIES = ['Small Box', 'Medium Box', 'Large Box', 'Paper Roll', 'Tape Roll']
+LABOR_SUPPLY = 'Labor'
+
+CatalogItem = namedtuple('CatalogItem', [
+    'item_name', 'hidden_value', 'item_tab', 'is_second_truck', 'is_small', 'is_medium', 'is_large'])
+
+
+def make_catalog_item(item_name, hidden_value, item_tab):
+    """Build a CatalogItem with its size-class flags worked out from the hidden value."""
+    hidden_value = int(hidden_value)
+    return CatalogItem(item_name, hidden_value, item_tab, hidden_value >= 15, hidden_value <= 5,
+                       10 <= hidden_value <= 15, hidden_value >= 20)
+
+
+class Catalog:
+    """Moving items indexed by item name."""
+
+    def __init__(self, rows=()):
+        self.items = {}
+        self.version = next(versions)
+        for row in rows:
+            self.items[row[0]] = make_catalog_item(row[0], row[1], row[2])
+
+    def __contains__(self, item_name):
+        return item_name in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def names(self):
+        return list(self.items)
+
+    def rows(self):
+        """Return (item_name, hidden_value, item_tab) rows sorted by name, like the items query does."""
+        return sorted(((item.item_name, item.hidden_value, item.item_tab) for item in self.items.values()),
+                      key=lambda row: row[0].casefold())
+
+    def set_item(self, item_name, hidden_value, item_tab, old_name=None):
+        if old_name is not None and old_name != item_name:
+            self.items.pop(old_name, None)
+        self.items[item_name] = make_catalog_item(item_name, hidden_value, item_tab)
+        self.version = next(versions)
+
+    def remove_item(self, item_name):
+        if self.items.pop(item_name, None) is not None:
+            self.version = next(versions)
+
+
+class PackingCatalog:
+    """Rooms as a rooms x materials matrix and supplies as price vectors keyed by supply name."""
+
+    def __init__(self, room_rows, supply_rows):
+        self.version = next(versions)
+        # room rows are full rooms table rows: id, room_name, five material quantities and labor hours
+        self.room_names = [row[1] for row in room_rows]
+        self.room_index = {name: index for index, name in enumerate(self.room_names)}
+        self.room_needs = numpy.array([row[2:8] for row in room_rows], dtype=float).reshape(len(room_rows), 6)
+        self.order_prices = {row[1]: row[3] for row in supply_rows}
+        self.resell_prices = {row[1]: row[4] for row in supply_rows}
+        self.order_vector = numpy.array([self.order_prices[name] for name in PACKING_SUPPLIES], dtype=float)
+        self.resell_vector = numpy.array([self.resell_prices[name] for name in PACKING_SUPPLIES], dtype=float)
+        self.labor_rate = self.order_prices[LABOR_SUPPLY]
+
+    def count_vector(self, counts):
+        """Turn (room_name, count) pairs into a vector over room_names, ignoring unknown rooms."""
+        vector = numpy.zeros(len(self.room_names))
+        for name, count in counts:
+            if name in self.room_index:
+                vector[self.room_index[name]] += count
+        return vector
+
+
+class FormulaTable:
+    """Formula rows parsed once and looked up by formula name."""
+
+    def __init__(self, rows):
+        self.version = next(versions)
+        self.names = [row[0] for row in rows]
+        self.numbers = {row[0]: row[1].split('-') for row in rows}
+        self.distance_fee = self.get_ints('Distance Addition')
+        self.long_distance_fee = self.get_ints('Long Distance Addition')
+        self.fort_riley_fee = self.get_ints('Fort Riley Adjustment')
+        self.second_truck_fee = self.get_ints('Second Truck')
+        self.small_fee = self.get_ints('Small Addition')
+        self.med_fee = self.get_ints('Med Addition')
+        self.large_fee = self.get_ints('Large Addition')
+        self.adjust = self.get_float('Adjust Multiplier')
+        self.unload = self.get_float('Unload Only')
+        self.load = self.get_float('Load Only')
+        self.low = self.get_float('Low Range')
+        self.high = self.get_float('High Range')
+        # compile the "value-multiplier-value-multiplier..." formula into a lookup table once
+        hidden_value_formulas = self.get_ints('Hidden Value Multiplier')
+        self.multipliers = {}
+        for i in range(0, len(hidden_value_formulas) - 1, 2):
+            self.multipliers.setdefault(hidden_value_formulas[i], hidden_value_formulas[i + 1])
+
+    def get_ints(self, name):
+        return [int(number) for number in self.numbers[name]]
+
+    def get_float(self, name):
+        return float(self.numbers[name][0])
+
+    def hidden_value_pairs(self):
+        numbers = self.numbers['Hidden Value Multiplier']
+        return [(numbers[i], numbers[i + 1]) for i in range(0, len(numbers) - 1, 2)]
+
+    def get_multiplier(self, hidden_value):
+        return self.multipliers.get(hidden_value, 1)
+
+    def get_multipliers(self, hidden_values):
+        """Look up the multipliers of a numpy array of hidden values, once per distinct value."""
+        values, inverse = numpy.unique(hidden_values, return_inverse=True)
+        multipliers = numpy.array([self.get_multiplier(value) for value in values.tolist()], dtype=numpy.int64)
+        return multipliers[inverse].reshape(numpy.shape(hidden_values))
+
+    def get_scale(self, slider_value):
+        return get_slider_scale(slider_value, self.low, self.high)
+
+
+def get_slider_scale(slider_value, low, high):
+    """Return the sliding scale rate for a 1-5 slider position."""
+    if slider_value == 1:
+        return low
+    elif slider_value == 2:
+        return float((low + 1) / 2)
+    elif slider_value == 3:
+        return 1
+    elif slider_value == 4:
+        return float((high + 1) / 2)
+    else:
+        return high
+
+
+class RunningEstimate:
+    """Moving estimate totals kept up to date one count change at a time."""
+
+    def __init__(self, catalog, formulas, counts=()):
+        self.catalog = catalog
+        self.catalog_version = catalog.version
+        self.formulas = formulas
+        self.counts = {}
+        self.base_score = 0
+        self.second_truck_counter = 0
+        self.small_counter = 0
+        self.med_counter = 0
+        self.large_counter = 0
+        for name, count in counts:
+            self.set_count(name, count)
+
+    def is_current(self, catalog, formulas):
+        return self.catalog is catalog and self.catalog_version == catalog.version and self.formulas is formulas
+
+    def set_count(self, item_name, count):
+        """Apply the difference between the new and the previous count of an item, ignoring unknown items."""
+        item = self.catalog.items.get(item_name)
+        if item is None:
+            return
+        change = count - self.counts.get(item_name, 0)
+        if change == 0:
+            return
+        if count == 0:
+            del self.counts[item_name]
+        else:
+            self.counts[item_name] = count
+        if not self.counts:
+            # start again from an exact zero instead of carrying float leftovers
+            self.base_score = 0
+        else:
+            self.base_score += change * item.hidden_value * self.formulas.get_multiplier(item.hidden_value)
+        if item.is_second_truck:
+            self.second_truck_counter += change
+        if item.is_small:
+            self.small_counter += change
+        if item.is_medium:
+            self.med_counter += change
+        if item.is_large:
+            self.large_counter += change
+
+    def estimate(self, round_trip_distance, fort_riley, estimator_adjustment, slider_value):
+        formulas = self.formulas
+        if round_trip_distance < 30:
+            distance_addition = formulas.distance_fee[0]
+        else:
+            distance_addition = formulas.distance_fee[1] * round_trip_distance
+        if round_trip_distance > 500:
+            long_distance_addition = formulas.long_distance_fee[0]
+        else:
+            long_distance_addition = formulas.long_distance_fee[1]
+        fort_riley_addition = formulas.fort_riley_fee[0] if fort_riley else formulas.fort_riley_fee[1]
+        second_truck_addition = \
+            formulas.second_truck_fee[0] if self.second_truck_counter > 30 else formulas.second_truck_fee[1]
+        small_addition = formulas.small_fee[0] if self.small_counter > 100 else formulas.small_fee[1]
+        med_addition = formulas.med_fee[0] if self.med_counter > 20 else formulas.med_fee[1]
+        large_addition = formulas.large_fee[0] if self.large_counter > 7 else formulas.large_fee[1]
+
+        total_before = self.base_score + distance_addition + long_distance_addition + fort_riley_addition +\
+            second_truck_addition + small_addition + med_addition + large_addition + estimator_adjustment
+        scale = formulas.get_scale(slider_value)
+        final_value = round(total_before * formulas.adjust * scale, 2)
+        return MovingEstimate(self.base_score, distance_addition, long_distance_addition, fort_riley_addition,
+                              second_truck_addition, small_addition, med_addition, large_addition,
+                              estimator_adjustment, formulas.adjust, scale, final_value,
+                              round(final_value * formulas.unload, 2), round(final_value * formulas.load, 2),
+                              [[name, count] for name, count in self.counts.items()])
+
+
+def calculate_estimate(catalog, formulas, counts, round_trip_distance, fort_riley, estimator_adjustment, slider_value):
+    """Price one moving job.
+
+    catalog is a Catalog, formulas is a FormulaTable and counts is an iterable of (item_name, count) pairs in the
+    order they should be listed.
+    """
+    running = RunningEstimate(catalog, formulas, counts)
+    return running.estimate(round_trip_distance, fort_riley, estimator_adjustment, slider_value)
+
+
+class QuoteCache:
+    """Least recently used pricing results keyed by a quote fingerprint, with hit and miss counters."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return f"QuoteCache({len(self.results)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses)"
+
+    def get(self, fingerprint, price):
+        """Return the cached result for fingerprint, calling price() to fill it on a miss."""
+        if fingerprint in self.results:
+            self.results.move_to_end(fingerprint)
+            self.hits += 1
+            return self.results[fingerprint]
+        self.misses += 1
+        result = price()
+        self.results[fingerprint] = result
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.results.clear()
+
+
+def nonzero_counts(counts):
+    return tuple(sorted((name, count) for name, count in counts if count != 0))
+
+
+def estimate_fingerprint(catalog, formulas, counts, round_trip_distance, fort_riley, estimator_adjustment,
+                         slider_value):
+    """Canonical key of a moving quote: the same inputs in any item order give the same fingerprint."""
+    return ('moving', catalog.version, formulas.version, nonzero_counts(counts), round_trip_distance,
+            estimator_adjustment, bool(fort_riley), slider_value)
+
+
+def packing_fingerprint(packing, formulas, counts, slider_value):
+    """Canonical key of a packing quote."""
+    return 'packing', packing.version, formulas.version, nonzero_counts(counts), slider_value
+
+
+def calculate_packing_cost(packing, formulas, counts, slider_value):
+    """Price the packing of one job.
+
+    packing is a PackingCatalog and counts is an iterable of (room_name, count) pairs in the order they should be
+    listed.
+    """
+    counted_rooms = [[name, count] for name, count in counts if count != 0 and name in packing.room_index]
+    needs = packing.count_vector(counted_rooms) @ packing.room_needs
+    scale = formulas.get_scale(slider_value)
+    material_counts = needs[:5]
+    return PackingCost(material_counts.tolist(), float(needs[5]), (material_counts * packing.order_vector).tolist(),
+                       (material_counts * packing.resell_vector * scale).tolist(),
+                       float(needs[5] * packing.labor_rate * scale), scale, counted_rooms)
+
+
+def calculate_packing_costs(packing, formulas, counts, slider_value):
+    """Price the packing of many jobs at once.
+
+    counts is an N x R matrix whose columns follow packing.room_names and slider_value is a scalar or a length N
+    array. Returns a PackingCost whose fields are arrays with one row per job; counted_rooms is left as None.
+    """
+    needs = numpy.atleast_2d(numpy.asarray(counts, dtype=float)) @ packing.room_needs
+    slider_value = numpy.broadcast_to(numpy.asarray(slider_value, dtype=numpy.int64), needs.shape[:1])
+    scales = numpy.array([formulas.get_scale(i) for i in range(1, 6)], dtype=float)
+    scale = scales[numpy.where((slider_value >= 1) & (slider_value <= 4), slider_value - 1, 4)]
+    material_counts = needs[:, :5]
+    return PackingCost(material_counts, needs[:, 5], material_counts * packing.order_vector,
+                       material_counts * packing.resell_vector * scale[:, None], needs[:, 5] * packing.labor_rate * scale,
+                       scale, None)
+
+
+def display_number(num):
+    """Whole numbers as an int and others rounded to cents, the way quantities and prices are shown."""
+    return round(num, 2) if num != int(num) else int(num)
+
+
+def round_cents(values):
+    """Round an array to cents the same way the builtin round(x, 2) rounds a single float."""
+    values = numpy.asarray(values, dtype=float)
+    rounded = numpy.round(values, 2)
+    scaled = values * 100
+    # numpy rounds the scaled value, so only near-ties can land on a different cent than round() does
+    ties = numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, 2) for value in values[ties].tolist()]
+    return rounded
+
+
+def calculate_estimates(catalog, formulas, counts, round_trip_distance, fort_riley, estimator_adjustment, slider_value):
+    """Price many moving jobs at once.
+
+    counts is an N x M matrix whose columns follow catalog.names() and formulas is a FormulaTable. The remaining
+    inputs can be scalars or length N arrays. Returns a MovingEstimate whose fields are length N arrays; counted_items is left as None.
+    """
+    counts = numpy.atleast_2d(numpy.asarray(counts, dtype=numpy.int64))
+    items = list(catalog.items.values())
+    values = numpy.array([item.hidden_value for item in items], dtype=numpy.int64)
+    weights = values * formulas.get_multipliers(values)
+    size_classes = numpy.array([[item.is_second_truck, item.is_small, item.is_medium, item.is_large] for item in items],
+                               dtype=numpy.int64).reshape(len(items), 4)
+    base_score = counts @ weights
+    second_truck_counter, small_counter, med_counter, large_counter = (counts @ size_classes).T
+
+    round_trip_distance = numpy.broadcast_to(numpy.asarray(round_trip_distance, dtype=numpy.int64), base_score.shape)
+    fort_riley = numpy.broadcast_to(numpy.asarray(fort_riley, dtype=bool), base_score.shape)
+    estimator_adjustment = numpy.broadcast_to(numpy.asarray(estimator_adjustment, dtype=numpy.int64),
+                                              base_score.shape)
+    slider_value = numpy.broadcast_to(numpy.asarray(slider_value, dtype=numpy.int64), base_score.shape)
+
+    distance_addition = numpy.where(round_trip_distance < 30, formulas.distance_fee[0],
+                                    formulas.distance_fee[1] * round_trip_distance)
+    long_distance_addition = numpy.where(round_trip_distance > 500, formulas.long_distance_fee[0],
+                                         formulas.long_distance_fee[1])
+    fort_riley_addition = numpy.where(fort_riley, formulas.fort_riley_fee[0], formulas.fort_riley_fee[1])
+    second_truck_addition = numpy.where(second_truck_counter > 30, formulas.second_truck_fee[0],
+                                        formulas.second_truck_fee[1])
+    small_addition = numpy.where(small_counter > 100, formulas.small_fee[0], formulas.small_fee[1])
+    med_addition = numpy.where(med_counter > 20, formulas.med_fee[0], formulas.med_fee[1])
+    large_addition = numpy.where(large_counter > 7, formulas.large_fee[0], formulas.large_fee[1])
+
+    total_before = base_score + distance_addition + long_distance_addition + fort_riley_addition +\
+        second_truck_addition + small_addition + med_addition + large_addition + estimator_adjustment
+    scales = numpy.array([formulas.get_scale(i) for i in range(1, 6)], dtype=float)
+    scale = scales[numpy.where((slider_value >= 1) & (slider_value <= 4), slider_value - 1, 4)]
+    final_value = round_cents(total_before * formulas.adjust * scale)
+    return MovingEstimate(base_score, distance_addition, long_distance_addition, fort_riley_addition,
+                          second_truck_addition, small_addition, med_addition, large_addition,
+                          numpy.array(estimator_adjustment), formulas.adjust, scale, final_value,
+                          round_cents(final_value * formulas.unload), round_cents(final_value * formulas.load), None)
@@ -0,0 +1,69 @@
+"""Parameterized queries run the same way on the hosted database (psycopg2) and offline.db (sqlite3).
+
+SQL is written once with %s placeholders. Named reads are prepared on first use on connections made by
+db.ConnectionPool and executed by name after that, so the server parses and plans them once per connection instead
+of on every click.
+"""
+import itertools
+import re
+import sqlite3
+
+import psycopg2.extensions
+
+# reads the window and the admin dialogs repeat, by name
+QUERIES = {
+    'items': '''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name ASC''',
+    'formulas': '''SELECT formula_name, formula_numbers FROM formulas ORDER BY id''',
+    'supplies': '''SELECT id, supply_name, supplier, order_price, resell_price FROM supplies ORDER BY id ASC''',
+    'supplies_by_name': '''SELECT id, supply_name, supplier, order_price, resell_price FROM supplies
+        ORDER BY supply_name ASC''',
+    'rooms': '''SELECT id, room_name, small_box_quantity, medium_box_quantity, large_box_quantity, paper_roll_quantity,
+        tape_roll_quantity, labor_hours FROM rooms ORDER BY id ASC''',
+    'rooms_by_name': '''SELECT id, room_name, small_box_quantity, medium_box_quantity, large_box_quantity,
+        paper_roll_quantity, tape_roll_quantity, labor_hours FROM rooms ORDER BY room_name ASC''',
+}
+
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has prepared; they last as long as the session."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def numbered(sql):
+    """Turn %s placeholders into the $1, $2, ... that PREPARE expects."""
+    numbers = itertools.count(1)
+    return re.sub(r'%s', lambda match: f'${next(numbers)}', sql)
+
+
+def execute(conn, sql, params=(), name=None):
+    """Run sql with %s placeholders on either kind of connection and return the cursor holding its rows.
+
+    With a name, the statement is prepared the first time it runs on a PreparedConnection and executed by name after
+    that; other connections just run it.
+    """
+    if isinstance(conn, sqlite3.Connection):
+        return conn.execute(sql.replace('%s', '?'), params)
+    cursor = conn.cursor()
+    prepared = getattr(conn, 'prepared', None)
+    if name is None or prepared is None:
+        cursor.execute(sql, params or None)
+        return cursor
+    if name not in prepared:
+        cursor.execute(f'''PREPARE {name} AS {numbered(sql)}''')
+        prepared.add(name)
+    if params:
+        cursor.execute(f'''EXECUTE {name} ({', '.join(['%s'] * len(params))})''', params)
+    else:
+        cursor.execute(f'''EXECUTE {name}''')
+    return cursor
+
+
+def fetch_all(conn, name, params=()):
+    """Rows of one of the QUERIES."""
+    cursor = execute(conn, QUERIES[name], params, name)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
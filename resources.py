@@ -0,0 +1,29 @@
+"""Icons and fonts shared by every widget that uses them, so each PNG is decoded and each font is built only once."""
+import functools
+import os
+import sys
+
+from PyQt5.QtGui import QIcon, QFont
+
+
+def resource_path(relative_path):
+    """Get the absolute path to the resource, whether in a bundle or from the filesystem."""
+    try:
+        # PyInstaller sets _MEIPASS to a temporary folder when running from an executable
+        base_path = sys._MEIPASS
+    except Exception:
+        # If running in normal Python environment, use the current directory
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+@functools.lru_cache(maxsize=None)
+def icon(name):
+    """The icon in icons/name; QIcon copies share the decoded image."""
+    return QIcon(resource_path(f"icons/{name}"))
+
+
+@functools.lru_cache(maxsize=None)
+def font(size):
+    return QFont('Times', size)
@@ -0,0 +1,53 @@
+import psycopg2
+
+TABLES = ['items', 'formulas', 'supplies', 'rooms']
+# channel the app LISTENs on, see CATALOG_CHANNEL in app.py
+CHANNEL = 'catalog_changes'
+
+
+def connect_to_db(url):
+    """Connect to the PostgreSQL database."""
+    try:
+        # Establish the connection
+        conn = psycopg2.connect(url)
+        return conn
+    except Exception as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+
+def add_change_notifications(conn):
+    """Send the table name on the catalog channel after every statement that writes to a catalog table."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+            for table in TABLES:
+                cursor.execute(f"""
+                    DROP TRIGGER IF EXISTS {table}_notify_catalog_change ON {table};
+                    CREATE TRIGGER {table}_notify_catalog_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+                        FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+                """)
+            conn.commit()
+            print("Change notifications added successfully.")
+    except Exception as e:
+        print(f"Error adding change notifications: {e}")
+        conn.rollback()
+
+
+def main():
+    db_url = "URL_OF_DB"
+
+    conn = connect_to_db(db_url)
+    if conn:
+        add_change_notifications(conn)
+        conn.close()
+
+if __name__ == "__main__":
+    main()
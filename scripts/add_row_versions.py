@@ -0,0 +1,93 @@
+import psycopg2
+
+TABLES = ['items', 'formulas', 'supplies', 'rooms']
+
+
+def connect_to_db(url):
+    """Connect to the PostgreSQL database."""
+    try:
+        # Establish the connection
+        conn = psycopg2.connect(url)
+        return conn
+    except Exception as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+
+def add_row_versions(conn, keep_deleted_days=90):
+    """Stamp every row with the id of the transaction that last wrote it and keep deleted rows as tombstones for delta
+    sync.
+
+    Clients keep the oldest transaction still running when they last synced (txid_snapshot_xmin) as their mark and
+    read rows stamped at or after it next time. Every transaction stamped below the mark had already finished then,
+    so a transaction that commits later can't slip under it the way it could with numbers from a sequence.
+
+    Tombstones older than keep_deleted_days are pruned as rows get deleted; deleted_rows_horizon keeps the newest
+    pruned stamp, and clients that last synced before it read whole tables again.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS deleted_rows (
+                    table_name VARCHAR(255) NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    row_version BIGINT NOT NULL DEFAULT txid_current(),
+                    deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+                CREATE INDEX IF NOT EXISTS deleted_rows_version ON deleted_rows (table_name, row_version);
+                CREATE INDEX IF NOT EXISTS deleted_rows_deleted_at ON deleted_rows (deleted_at);
+
+                CREATE TABLE IF NOT EXISTS deleted_rows_horizon (row_version BIGINT NOT NULL);
+                INSERT INTO deleted_rows_horizon SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM deleted_rows_horizon);
+
+                CREATE OR REPLACE FUNCTION bump_row_version() RETURNS trigger AS $$
+                BEGIN
+                    NEW.row_version := txid_current();
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE OR REPLACE FUNCTION keep_deleted_row() RETURNS trigger AS $$
+                BEGIN
+                    INSERT INTO deleted_rows (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+                    WITH pruned AS (
+                        DELETE FROM deleted_rows WHERE deleted_at < now() - interval '{int(keep_deleted_days)} days'
+                        RETURNING row_version)
+                    UPDATE deleted_rows_horizon SET row_version = greatest(row_version, pruned_version)
+                        FROM (SELECT max(row_version) AS pruned_version FROM pruned) AS newest
+                        WHERE pruned_version IS NOT NULL;
+                    RETURN OLD;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+            for table in TABLES:
+                cursor.execute(f"""
+                    ALTER TABLE {table}
+                        ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT txid_current();
+                    CREATE INDEX IF NOT EXISTS {table}_row_version ON {table} (row_version);
+
+                    DROP TRIGGER IF EXISTS {table}_bump_row_version ON {table};
+                    CREATE TRIGGER {table}_bump_row_version BEFORE UPDATE ON {table}
+                        FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+                    DROP TRIGGER IF EXISTS {table}_keep_deleted_row ON {table};
+                    CREATE TRIGGER {table}_keep_deleted_row AFTER DELETE ON {table}
+                        FOR EACH ROW EXECUTE FUNCTION keep_deleted_row();
+                """)
+            conn.commit()
+            print("Row versions added successfully.")
+    except Exception as e:
+        print(f"Error adding row versions: {e}")
+        conn.rollback()
+
+
+def main():
+    db_url = "URL_OF_DB"
+
+    conn = connect_to_db(db_url)
+    if conn:
+        add_row_versions(conn)
+        conn.close()
+
+if __name__ == "__main__":
+    main()
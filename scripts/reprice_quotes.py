@@ -0,0 +1,85 @@
+import sqlite3
+import sys
+import os
+import csv
+import pandas
+import numpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pricing
+
+
+def read_catalog(db_path):
+    """Read items and formulas from the app's offline database."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name ASC''')
+    items = cursor.fetchall()
+    cursor.execute('''SELECT formula_name, formula_numbers FROM formulas ORDER BY id''')
+    formulas = cursor.fetchall()
+    conn.close()
+    return pricing.Catalog(items), pricing.FormulaTable(formulas)
+
+
+def read_exported_quote(file_name):
+    """Read inputs and item counts from a CSV exported by the app."""
+    f = pandas.read_csv(file_name)
+    details = f['DETAILS']
+    rtd_raw = details[1]
+    rtd = int(rtd_raw[rtd_raw.index('RTD=') + len('RTD='):rtd_raw.index('):')])
+    fr_raw = details[3]
+    fort_riley = fr_raw[fr_raw.index('FRA=') + len('FRA='):fr_raw.index('):')] == 'Yes'
+    ea_raw = details[8]
+    ea = int(ea_raw[ea_raw.index('EA=') + len('EA='):ea_raw.index('):')])
+    scale_raw = details[12]
+    scale = int(scale_raw[scale_raw.index('SCALE=') + len('SCALE='):scale_raw.index('):')])
+    old_estimate = float(f['OUTPUT'][12].replace('$', ''))
+    counts = {}
+    no = 18 if details[16] == 'Total Moving & Packing Price:' else 16
+    while details[no] != 'NOTE' and details[no] != 'ROOM NAMES':
+        counts[details[no]] = int(f['OUTPUT'][no])
+        no += 1
+    return rtd, fort_riley, ea, scale, old_estimate, counts
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else '.'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'offline.db'
+
+    catalog, formulas = read_catalog(db_path)
+    columns = {name: index for index, name in enumerate(catalog.names())}
+    file_names = sorted(name for name in os.listdir(folder) if name.lower().endswith('.csv'))
+
+    counts = numpy.zeros((len(file_names), len(catalog)), dtype=numpy.int64)
+    inputs = numpy.zeros((len(file_names), 4), dtype=numpy.int64)
+    old_estimates = []
+    for row, file_name in enumerate(file_names):
+        try:
+            rtd, fort_riley, ea, scale, old_estimate, item_counts = read_exported_quote(os.path.join(folder, file_name))
+        except (KeyError, ValueError) as e:
+            print(f"Skipping {file_name}: {e}")
+            old_estimates.append(None)
+            continue
+        for name, count in item_counts.items():
+            if name in columns:
+                counts[row, columns[name]] = count
+            else:
+                print(f"{file_name}: '{name}' is not in the catalog anymore")
+        inputs[row] = [rtd, fort_riley, ea, scale]
+        old_estimates.append(old_estimate)
+
+    estimates = pricing.calculate_estimates(catalog, formulas, counts, inputs[:, 0], inputs[:, 1].astype(bool),
+                                            inputs[:, 2], inputs[:, 3])
+
+    with open('repriced.csv', 'w', encoding="utf-8", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['FILE', 'OLD ESTIMATE', 'NEW ESTIMATE'])
+        for row, file_name in enumerate(file_names):
+            if old_estimates[row] is None:
+                continue
+            writer.writerow([file_name, f"{old_estimates[row]:.2f}", f"{estimates.final_value[row]:.2f}"])
+    print(f"Repriced {sum(x is not None for x in old_estimates)} quotes into repriced.csv")
+
+
+if __name__ == "__main__":
+    main()
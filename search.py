@@ -0,0 +1,47 @@
+"""Prefix search over item and room names, kept as a sorted list of name words so a keystroke costs a few bisects."""
+import bisect
+import re
+
+
+def words(text):
+    """Lowercased words of text; 'Desk (small)' gives desk and small."""
+    return re.findall(r'\w+', text.casefold())
+
+
+class NameIndex:
+    """(word, name, tab) entries sorted by word.
+
+    A search matches the names that have, for every word typed, a word starting with it, so "ches dra" finds
+    "Chest of Drawers". Entries are added and removed one name at a time as the catalog is edited.
+    """
+
+    def __init__(self, names=()):
+        # names are (name, tab) pairs
+        self.keys = sorted({(word, name, tab) for name, tab in names for word in words(name)})
+
+    def add(self, name, tab):
+        for word in set(words(name)):
+            bisect.insort(self.keys, (word, name, tab))
+
+    def remove(self, name, tab):
+        for word in set(words(name)):
+            index = bisect.bisect_left(self.keys, (word, name, tab))
+            if index < len(self.keys) and self.keys[index] == (word, name, tab):
+                del self.keys[index]
+
+    def starting_with(self, prefix):
+        start = bisect.bisect_left(self.keys, (prefix,))
+        end = bisect.bisect_left(self.keys, (prefix + '\U0010ffff',))
+        return {(name, tab) for word, name, tab in self.keys[start:end]}
+
+    def search(self, text):
+        """(name, tab) pairs matching text, or None when text has no words and nothing is filtered."""
+        prefixes = words(text)
+        if not prefixes:
+            return None
+        # the longest word usually narrows the most, the others only filter what it found
+        prefixes.sort(key=len, reverse=True)
+        matches = self.starting_with(prefixes[0])
+        for prefix in prefixes[1:]:
+            matches &= self.starting_with(prefix)
+        return matches
@@ -0,0 +1,55 @@
+"""Staff view of a packing quote as a table model: one row per supply and a total row, filled from a PackingCost in
+one update instead of a table item per cell."""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+import pricing
+
+HEADERS = ['', 'Quantity', 'Supply Cost', 'Resell Price', 'Profit']
+ROW_NAMES = ['Small Boxes', 'Medium Boxes', 'Large Boxes', 'Paper Rolls', 'Tape Rolls', 'Total']
+
+
+class StaffCostModel(QAbstractTableModel):
+    """Quantity, supply cost, resell price and profit of each packing supply and of all of them together.
+
+    Cells are formatted once per quote in set_packing_cost, data() only hands out the stored text.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # empty until the first quote, like the table was before
+        self.cells = [[f"  {name}"] + [None] * (len(HEADERS) - 1) for name in ROW_NAMES]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ROW_NAMES)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.cells[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled
+
+    def set_packing_cost(self, packing_cost):
+        """Show a PackingCost, updating the view once for all cells."""
+        rows = zip(list(packing_cost.material_counts) + [packing_cost.all_materials_count],
+                   list(packing_cost.supply_costs) + [packing_cost.total_supply_cost],
+                   list(packing_cost.resell_prices) + [packing_cost.total_resell_price])
+        for cells, (count, supply_cost, resell_price) in zip(self.cells, rows):
+            cells[1:] = [str(pricing.display_number(count))] + [f"${pricing.display_number(value)}"
+                                                                for value in (supply_cost, resell_price,
+                                                                              resell_price - supply_cost)]
+        self.dataChanged.emit(self.index(0, 1), self.index(len(ROW_NAMES) - 1, len(HEADERS) - 1),
+                              [Qt.DisplayRole])
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from count_list import CountListModel, to_count  # noqa: E402
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def assert_index_matches(model):
+    assert model.rows == {name: row for row, name in enumerate(model.names)}
+    assert model.keys == [name.casefold() for name in model.names]
+    assert len(model.counts) == len(model.names)
+
+
+def test_names_are_kept_in_case_insensitive_order():
+    model = CountListModel(['chair', 'Bed', 'armoire', 'Desk'])
+    assert model.names == ['armoire', 'Bed', 'chair', 'Desk']
+    assert_index_matches(model)
+
+
+def test_insert_name_lands_in_order_and_shifts_later_rows():
+    model = CountListModel(['Armoire', 'Chair', 'Desk'])
+    model.set_count('Chair', 2)
+    model.set_count('Desk', 5)
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    model.insert_name('bed', 3)
+
+    assert inserted == [(1, 1)]
+    assert model.items() == [('Armoire', 0), ('bed', 3), ('Chair', 2), ('Desk', 5)]
+    assert model.row_of('Desk') == 3
+    assert_index_matches(model)
+    model.insert_name('Zebra Rug')
+    model.insert_name('Aardvark')
+    assert model.names == ['Aardvark', 'Armoire', 'bed', 'Chair', 'Desk', 'Zebra Rug']
+    assert_index_matches(model)
+
+
+def test_remove_name_returns_its_count_and_reindexes():
+    model = CountListModel(['Armoire', 'Bed', 'Chair', 'Desk'])
+    model.set_count('Bed', 4)
+    model.set_count('Desk', 1)
+
+    assert model.remove_name('Bed') == 4
+    assert model.remove_name('Sofa') == 0
+
+    assert model.items() == [('Armoire', 0), ('Chair', 0), ('Desk', 1)]
+    assert model.row_of('Bed') == -1
+    assert model.count('Desk') == 1
+    assert_index_matches(model)
+
+
+def test_count_changed_follows_edits():
+    model = CountListModel(['Armoire', 'Bed'])
+    changes = []
+    model.count_changed.connect(lambda name, count: changes.append((name, count)))
+    model.set_count('Bed', 2)
+    model.set_count('Bed', 2)
+    assert not model.set_count('Sofa', 1)
+    model.clear_counts()
+    assert changes == [('Bed', 2), ('Bed', 0)]
+
+
+def test_reset_replaces_rows_and_index():
+    model = CountListModel(['Armoire', 'Bed'])
+    model.set_count('Bed', 2)
+    model.reset(['desk', 'Chair'])
+    assert model.items() == [('Chair', 0), ('desk', 0)]
+    assert model.row_of('Bed') == -1
+    assert_index_matches(model)
+
+
+def test_to_count_treats_partial_input_as_zero():
+    assert to_count('12') == 12
+    assert to_count('') == 0
+    assert to_count('-') == 0
@@ -0,0 +1,83 @@
+import psycopg2.errors
+import pytest
+
+import db
+
+TABLES = {'items': ('id', 'item_name', 'hidden_value', 'item_tab')}
+CHANGED = [[3, 'Desk', 10, 'Office']]
+WHOLE = [(1, 'Armoire', 20, 'Bedroom'), (3, 'Desk', 10, 'Office')]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Stands in for the database: the snapshot fetch_changes reads and the whole tables it falls back to."""
+    state = {'snapshot': {'items': {'rows': CHANGED, 'deleted': [2]}, 'snapshot_xmin': 500, 'deleted_horizon': 100},
+             'whole_reads': []}
+
+    def fetch_snapshot(conn, name, query, params):
+        if isinstance(state['snapshot'], Exception):
+            raise state['snapshot']
+        return state['snapshot']
+
+    def fetch_tables(conn, tables):
+        state['whole_reads'].append(set(tables))
+        return {table: WHOLE for table in tables}
+
+    monkeypatch.setattr(db, 'fetch_snapshot', fetch_snapshot)
+    monkeypatch.setattr(db, 'fetch_tables', fetch_tables)
+    return state
+
+
+def test_mark_within_range_reads_only_changes(server):
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {'items': 300})['items']
+    assert rows == [(3, 'Desk', 10, 'Office')]
+    assert deleted_ids == [2]
+    assert new_mark == 500
+    assert server['whole_reads'] == []
+
+
+def test_mark_equal_to_snapshot_xmin_reads_only_changes(server):
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {'items': 500})['items']
+    assert deleted_ids == [2]
+    assert server['whole_reads'] == []
+
+
+def test_no_mark_replaces_the_table(server):
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {})['items']
+    # without a mark the snapshot already holds every row
+    assert rows == [(3, 'Desk', 10, 'Office')]
+    assert deleted_ids is None
+    assert new_mark == 500
+
+
+@pytest.mark.parametrize('mark', [50, 100])
+def test_mark_at_or_before_pruned_tombstones_reads_the_whole_table(server, mark):
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {'items': mark})['items']
+    assert rows == WHOLE
+    assert deleted_ids is None
+    assert new_mark == 500
+    assert server['whole_reads'] == [{'items'}]
+
+
+def test_mark_ahead_of_the_server_reads_the_whole_table(server):
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {'items': 501})['items']
+    assert rows == WHOLE
+    assert deleted_ids is None
+    assert new_mark == 500
+
+
+def test_only_stale_tables_are_read_whole(server):
+    tables = dict(TABLES, rooms=('id', 'room_name'))
+    server['snapshot']['rooms'] = {'rows': [], 'deleted': [7]}
+    changes = db.fetch_changes(None, tables, {'items': 300, 'rooms': 90})
+    assert changes['items'][1] == [2]
+    assert changes['rooms'] == (WHOLE, None, 500)
+    assert server['whole_reads'] == [{'rooms'}]
+
+
+def test_database_without_row_versions_replaces_every_table(server):
+    server['snapshot'] = psycopg2.errors.UndefinedTable()
+    rows, deleted_ids, new_mark = db.fetch_changes(None, TABLES, {'items': 300})['items']
+    assert rows == WHOLE
+    assert deleted_ids is None
+    assert new_mark == 0
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+
+import pytest
+
+import db
+import edits
+import offline_db
+
+ITEMS = [('Armoire', 20, 'Bedroom'), ('Bed', 15, 'Bedroom'), ('Chair', 5, 'Kitchen')]
+
+
+@pytest.fixture
+def cache():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, item_name TEXT NOT NULL,
+        hidden_value INTEGER NOT NULL, item_tab TEXT NOT NULL)""")
+    conn.execute("CREATE TABLE sync_marks (table_name TEXT PRIMARY KEY, row_version INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO items (item_name, hidden_value, item_tab) VALUES (?, ?, ?)", ITEMS)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def cached_items(conn):
+    return conn.execute("SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name").fetchall()
+
+
+def test_statement_builds_parameterized_sql():
+    assert edits.statement(edits.Edit('items', 'insert', None, {'item_name': 'Desk', 'hidden_value': 10})) == \
+        ("INSERT INTO items (item_name, hidden_value) VALUES (%s, %s)", ['Desk', 10])
+    assert edits.statement(edits.Edit('rooms', 'update', 'Pantry', {'room_name': 'Larder', 'labor_hours': 2})) == \
+        ("UPDATE rooms SET room_name = %s, labor_hours = %s WHERE room_name = %s", ['Larder', 2, 'Pantry'])
+    assert edits.statement(edits.Edit('supplies', 'delete', 'Tape Roll', {})) == \
+        ("DELETE FROM supplies WHERE supply_name = %s", ['Tape Roll'])
+
+
+def test_row_name_follows_a_rename():
+    assert edits.row_name(edits.Edit('items', 'update', 'Bed', {'item_name': 'Bunk Bed'})) == 'Bunk Bed'
+    assert edits.row_name(edits.Edit('items', 'update', 'Bed', {'hidden_value': 3})) == 'Bed'
+
+
+def test_queued_edits_apply_to_the_cache_and_come_back_in_order(cache):
+    cache.execute("INSERT INTO sync_marks VALUES ('items', 42)")
+    queued = [
+        edits.Edit('items', 'insert', None, {'item_name': 'Desk', 'hidden_value': 10, 'item_tab': 'Office'}),
+        edits.Edit('items', 'update', 'Desk', {'item_name': 'Desk', 'hidden_value': 12, 'item_tab': 'Office'}),
+        edits.Edit('items', 'delete', 'Chair', {}),
+        edits.Edit('formulas', 'update', 'Low Range', {'formula_numbers': '0.7'}),
+    ]
+    cache.execute("CREATE TABLE formulas (id INTEGER PRIMARY KEY, formula_name TEXT, formula_numbers TEXT)")
+    cache.execute("INSERT INTO formulas (formula_name, formula_numbers) VALUES ('Low Range', '0.8')")
+    for edit in queued:
+        offline_db.queue_edit(cache, edit)
+
+    entries = offline_db.pending_edits(cache)
+    assert [edit for outbox_id, edit, base_version in entries] == queued
+    # formulas were never synced with a mark, so their base version is unknown
+    assert [base_version for outbox_id, edit, base_version in entries] == [42, 42, 42, None]
+    assert cached_items(cache) == [('Armoire', 20, 'Bedroom'), ('Bed', 15, 'Bedroom'), ('Desk', 12, 'Office')]
+    assert cache.execute("SELECT formula_numbers FROM formulas").fetchone() == ('0.7',)
+
+
+@pytest.fixture
+def server():
+    dsn = os.environ.get('TEST_DATABASE_URL')
+    if not dsn:
+        pytest.skip('TEST_DATABASE_URL is not set')
+    psycopg2 = pytest.importorskip('psycopg2')
+    conn = psycopg2.connect(dsn)
+    cursor = conn.cursor()
+    cursor.execute('''CREATE SCHEMA outbox_test''')
+    cursor.execute('''SET search_path TO outbox_test''')
+    cursor.execute('''CREATE TABLE items (id SERIAL PRIMARY KEY, item_name TEXT NOT NULL, hidden_value INTEGER NOT NULL,
+        item_tab TEXT NOT NULL, row_version BIGINT NOT NULL DEFAULT txid_current())''')
+    cursor.executemany('''INSERT INTO items (item_name, hidden_value, item_tab) VALUES (%s, %s, %s)''', ITEMS)
+    conn.commit()
+    cursor.close()
+    yield conn
+    conn.rollback()
+    cursor = conn.cursor()
+    cursor.execute('''DROP SCHEMA outbox_test CASCADE''')
+    conn.commit()
+    conn.close()
+
+
+def server_mark(conn):
+    cursor = conn.cursor()
+    cursor.execute('''SELECT txid_snapshot_xmin(txid_current_snapshot())''')
+    mark = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return mark
+
+
+def server_items(conn):
+    cursor = conn.cursor()
+    cursor.execute('''SELECT item_name, hidden_value, item_tab FROM items ORDER BY item_name''')
+    rows = cursor.fetchall()
+    conn.commit()
+    cursor.close()
+    return rows
+
+
+def test_replay_skips_rows_changed_on_the_server_since_the_mark(server):
+    mark = server_mark(server)
+    cursor = server.cursor()
+    cursor.execute('''UPDATE items SET hidden_value = 25, row_version = txid_current() WHERE item_name = 'Armoire' ''')
+    server.commit()
+    cursor.close()
+    stale = edits.Edit('items', 'update', 'Armoire', {'hidden_value': 1})
+    fresh = edits.Edit('items', 'update', 'Bed', {'hidden_value': 10})
+    unknown = edits.Edit('items', 'update', 'Chair', {'hidden_value': 3})
+
+    conflicts = db.replay_edits(server, [(stale, mark), (fresh, mark), (unknown, None)])
+
+    assert conflicts == [stale]
+    assert server_items(server) == [('Armoire', 25, 'Bedroom'), ('Bed', 10, 'Bedroom'), ('Chair', 3, 'Kitchen')]
+
+
+def test_replay_applies_edits_in_order_and_checks_only_the_first_write(server):
+    mark = server_mark(server)
+    insert = edits.Edit('items', 'insert', None, {'item_name': 'Desk', 'hidden_value': 10, 'item_tab': 'Office'})
+    rename = edits.Edit('items', 'update', 'Desk', {'item_name': 'Desk (large)', 'hidden_value': 15})
+    taken = edits.Edit('items', 'insert', None, {'item_name': 'Bed', 'hidden_value': 1, 'item_tab': 'Bedroom'})
+    gone = edits.Edit('items', 'update', 'Sofa', {'hidden_value': 1})
+    deleted_twice = edits.Edit('items', 'delete', 'Sofa', {})
+
+    conflicts = db.replay_edits(server, [(insert, mark), (rename, mark), (taken, mark), (gone, mark),
+                                         (deleted_twice, mark)])
+
+    assert conflicts == [taken, gone]
+    assert server_items(server) == [('Armoire', 20, 'Bedroom'), ('Bed', 15, 'Bedroom'), ('Chair', 5, 'Kitchen'),
+                                    ('Desk (large)', 15, 'Office')]
+
+
+def test_replay_skips_edits_the_server_rejects_and_keeps_the_rest(server):
+    mark = server_mark(server)
+    rejected = edits.Edit('items', 'update', 'Bed', {'hidden_value': 'lots'})
+    accepted = edits.Edit('items', 'delete', 'Chair', {})
+
+    conflicts = db.replay_edits(server, [(rejected, mark), (accepted, mark)])
+
+    assert conflicts == [rejected]
+    assert server_items(server) == [('Armoire', 20, 'Bedroom'), ('Bed', 15, 'Bedroom')]
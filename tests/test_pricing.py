@@ -0,0 +1,256 @@
+import numpy
+import pytest
+
+import pricing
+
+FORMULA_ROWS = [
+    ('Distance Addition', '0-5'),
+    ('Long Distance Addition', '600-0'),
+    ('Fort Riley Adjustment', '500-0'),
+    ('Second Truck', '2000-0'),
+    ('Small Addition', '500-0'),
+    ('Med Addition', '500-0'),
+    ('Large Addition', '500-0'),
+    ('Adjust Multiplier', '1.0153'),
+    ('Unload Only', '0.5'),
+    ('Load Only', '0.65'),
+    ('Low Range', '0.8'),
+    ('High Range', '1.2'),
+    ('Hidden Value Multiplier', '1-3-5-3-10-4-15-4-20-5-30-5'),
+]
+ITEM_ROWS = [
+    ('Armoire', 20, 'Bedroom'),
+    ('Art', 5, 'Living Room'),
+    ('Barstools', 5, 'Kitchen'),
+    ('Bookcase', 10, 'Living Room'),
+    ('Dresser', 15, 'Bedroom'),
+    ('Piano', 30, 'Living Room'),
+    ('Lamp', 1, 'Living Room'),
+    ('Rug', 0, 'Living Room'),
+]
+ROOM_ROWS = [
+    (1, 'Pantry', 10.0, 15.0, 0.0, 5.0, 0.5, 1.0),
+    (2, 'Kitchen (Large)', 30.0, 25.0, 0.0, 20.0, 2.0, 99.0),
+    (3, 'Bedroom', 5.0, 10.0, 4.0, 2.5, 1.0, 3.5),
+]
+SUPPLY_ROWS = [
+    (1, 'Small Box', 'Lawrence Paper Company', 1.13, 2.83),
+    (2, 'Medium Box', 'Lawrence Paper Company', 1.74, 4.35),
+    (3, 'Large Box', 'Suburban Industrial Packaging', 10.0, 25.0),
+    (4, 'Paper Roll', 'Uline', 2.65, 6.63),
+    (5, 'Tape Roll', 'Suburban Industrial Packaging', 1.0, 2.5),
+    (6, 'Labor', 'Self', 95.0, 0.0),
+]
+
+
+@pytest.fixture
+def catalog():
+    return pricing.Catalog(ITEM_ROWS)
+
+
+@pytest.fixture
+def formulas():
+    return pricing.FormulaTable(FORMULA_ROWS)
+
+
+@pytest.fixture
+def packing():
+    return pricing.PackingCatalog(ROOM_ROWS, SUPPLY_ROWS)
+
+
+def test_batch_estimates_match_single_estimates(catalog, formulas):
+    random = numpy.random.default_rng(7)
+    jobs = 200
+    # large counts push some jobs over the second truck and size class thresholds
+    counts = random.integers(0, 40, size=(jobs, len(catalog)))
+    counts[::3] = 0
+    distances = random.integers(0, 800, size=jobs)
+    fort_riley = random.integers(0, 2, size=jobs).astype(bool)
+    adjustments = random.integers(-200, 200, size=jobs)
+    sliders = random.integers(1, 6, size=jobs)
+
+    batch = pricing.calculate_estimates(catalog, formulas, counts, distances, fort_riley, adjustments, sliders)
+
+    names = catalog.names()
+    for job in range(jobs):
+        single = pricing.calculate_estimate(catalog, formulas, list(zip(names, counts[job].tolist())),
+                                            int(distances[job]), bool(fort_riley[job]), int(adjustments[job]),
+                                            int(sliders[job]))
+        for field in pricing.MovingEstimate._fields:
+            if field == 'counted_items':
+                continue
+            batch_value = getattr(batch, field)
+            if numpy.ndim(batch_value):
+                batch_value = batch_value[job]
+            assert batch_value == pytest.approx(getattr(single, field)), (job, field)
+
+
+def test_batch_estimates_broadcast_scalar_inputs(catalog, formulas):
+    counts = [[1, 2, 0, 0, 3, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0]]
+    batch = pricing.calculate_estimates(catalog, formulas, counts, 120, True, 50, 4)
+    for job, row in enumerate(counts):
+        single = pricing.calculate_estimate(catalog, formulas, zip(catalog.names(), row), 120, True, 50, 4)
+        assert batch.final_value[job] == single.final_value
+        assert batch.unload_only_final[job] == single.unload_only_final
+        assert batch.load_only_final[job] == single.load_only_final
+
+
+# worked out by hand from the formulas of the original calculate_estimate: weight = hidden value x multiplier,
+# final = round(sum x adjust x scale, 2), with unload and load only rounded from final by the builtin round, so
+# 2619.475 becomes 2619.47
+GOLDEN_ESTIMATES = [
+    # 31 dressers (15 x 4) need a second truck and are over 20 medium items
+    ([('Dresser', 31)], 10, False, 0, 3,
+     (1860, 0, 0, 0, 2000, 0, 500, 0, 1.0, 4426.71, 2213.36, 2877.36)),
+    # one fewer stays under the second truck threshold
+    ([('Dresser', 30)], 10, False, 0, 3,
+     (1800, 0, 0, 0, 0, 0, 500, 0, 1.0, 2335.19, 1167.6, 1517.87)),
+    # over 100 small, 20 medium and 7 large items
+    ([('Lamp', 101), ('Armoire', 8), ('Bookcase', 21)], 29, False, 0, 3,
+     (1943, 0, 0, 0, 0, 500, 500, 500, 1.0, 3495.68, 1747.84, 2272.19)),
+    # long distance to Fort Riley on the low end of the sliding scale
+    ([('Piano', 2)], 600, True, -100, 1,
+     (300, 3000, 600, 500, 0, 0, 0, 0, 0.8, 3492.63, 1746.32, 2270.21)),
+    # and on the high end
+    ([('Piano', 2)], 600, True, -100, 5,
+     (300, 3000, 600, 500, 0, 0, 0, 0, 1.2, 5238.95, 2619.47, 3405.32)),
+]
+
+
+@pytest.mark.parametrize('counts, distance, fort_riley, adjustment, slider, expected', GOLDEN_ESTIMATES)
+def test_estimate_matches_the_original_formulas(catalog, formulas, counts, distance, fort_riley, adjustment, slider,
+                                                expected):
+    estimate = pricing.calculate_estimate(catalog, formulas, counts, distance, fort_riley, adjustment, slider)
+    assert (estimate.base_score, estimate.distance_addition, estimate.long_distance_addition,
+            estimate.fort_riley_addition, estimate.second_truck_addition, estimate.small_addition,
+            estimate.med_addition, estimate.large_addition, estimate.scale, estimate.final_value,
+            estimate.unload_only_final, estimate.load_only_final) == expected
+    assert estimate.estimator_addition == adjustment
+
+
+def test_slider_scales(formulas):
+    assert [formulas.get_scale(value) for value in range(1, 6)] == [0.8, 0.9, 1, 1.1, 1.2]
+
+
+def test_packing_cost_matches_the_original_formulas(packing, formulas):
+    cost = pricing.calculate_packing_cost(packing, formulas, [('Pantry', 2)], 1)
+    assert cost.material_counts == [20, 30, 0, 10, 1]
+    assert cost.supply_costs == pytest.approx([22.6, 52.2, 0, 26.5, 1.0])
+    assert cost.resell_prices == pytest.approx([45.28, 104.4, 0, 53.04, 2.0])
+    assert cost.labor_cost == pytest.approx(152.0)
+    assert cost.total_packing_cost == pytest.approx(356.72)
+    high = pricing.calculate_packing_cost(packing, formulas, [('Pantry', 2)], 5)
+    assert high.total_packing_cost == pytest.approx(535.08)
+
+
+def test_round_cents_matches_builtin_round():
+    values = [0.125, 0.135, 2.675, 1.005, 1234.5650000001, -0.125, 10.0, 99.995]
+    assert pricing.round_cents(values).tolist() == [round(value, 2) for value in values]
+
+
+def test_batch_packing_costs_match_single_packing_costs(packing, formulas):
+    random = numpy.random.default_rng(11)
+    jobs = 50
+    counts = random.integers(0, 4, size=(jobs, len(packing.room_names)))
+    sliders = random.integers(1, 6, size=jobs)
+
+    batch = pricing.calculate_packing_costs(packing, formulas, counts, sliders)
+
+    for job in range(jobs):
+        single = pricing.calculate_packing_cost(packing, formulas, zip(packing.room_names, counts[job].tolist()),
+                                                int(sliders[job]))
+        assert batch.material_counts[job].tolist() == pytest.approx(single.material_counts)
+        assert batch.labor_hours[job] == pytest.approx(single.labor_hours)
+        assert batch.supply_costs[job].tolist() == pytest.approx(single.supply_costs)
+        assert batch.resell_prices[job].tolist() == pytest.approx(single.resell_prices)
+        assert batch.labor_cost[job] == pytest.approx(single.labor_cost)
+        assert batch.scale[job] == single.scale
+
+
+def test_single_packing_cost_skips_unknown_and_zero_rooms(packing, formulas):
+    cost = pricing.calculate_packing_cost(packing, formulas, [('Pantry', 2), ('Garage', 1), ('Bedroom', 0)], 3)
+    assert cost.counted_rooms == [['Pantry', 2]]
+    assert cost.material_counts == [20.0, 30.0, 0.0, 10.0, 1.0]
+    assert cost.labor_hours == 2.0
+
+
+def assert_running_matches_fresh(running, catalog, formulas, counts):
+    for inputs in [(10, False, 0, 3), (120, True, -40, 1), (900, False, 75, 5)]:
+        fresh = pricing.calculate_estimate(catalog, formulas, counts.items(), *inputs)
+        assert running.estimate(*inputs)[:-1] == pytest.approx(fresh[:-1])
+        assert sorted(map(tuple, running.estimate(*inputs).counted_items)) == \
+            sorted((name, count) for name, count in counts.items() if count and name in catalog)
+
+
+def test_running_estimate_follows_count_changes_and_catalog_edits(catalog, formulas):
+    counts = {}
+    running = pricing.RunningEstimate(catalog, formulas)
+    random = numpy.random.default_rng(3)
+    names = catalog.names()
+    for step in range(300):
+        name = names[random.integers(len(names))]
+        # counts jump across the size class thresholds and back to zero
+        counts[name] = int(random.choice([0, 1, 5, 40, 120]))
+        running.set_count(name, counts[name])
+        if step % 25 == 0:
+            assert_running_matches_fresh(running, catalog, formulas, counts)
+    assert_running_matches_fresh(running, catalog, formulas, counts)
+
+    # the window starts a new running estimate when the catalog changes, from the counts it shows
+    catalog.set_item('Piano', 3, 'Living Room')
+    catalog.set_item('Sofa', 15, 'Living Room')
+    catalog.remove_item('Art')
+    assert not running.is_current(catalog, formulas)
+    counts.pop('Art', None)
+    counts['Sofa'] = 2
+    running = pricing.RunningEstimate(catalog, formulas, counts.items())
+    assert running.is_current(catalog, formulas)
+    assert_running_matches_fresh(running, catalog, formulas, counts)
+    running.set_count('Art', 4)
+    running.set_count('Sofa', 0)
+    counts['Sofa'] = 0
+    assert_running_matches_fresh(running, catalog, formulas, counts)
+
+    for name in list(counts):
+        running.set_count(name, 0)
+        counts[name] = 0
+    assert running.base_score == 0
+    assert_running_matches_fresh(running, catalog, formulas, counts)
+
+
+def test_quote_cache_counts_hits_and_evicts_least_recently_used():
+    cache = pricing.QuoteCache(maxsize=2)
+    calls = []
+
+    def price(value):
+        return lambda: calls.append(value) or value
+
+    assert cache.get('a', price(1)) == 1
+    assert cache.get('b', price(2)) == 2
+    assert cache.get('a', price(10)) == 1
+    # b is now the least recently used and makes room for c
+    assert cache.get('c', price(3)) == 3
+    assert cache.get('b', price(20)) == 20
+    assert calls == [1, 2, 3, 20]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 4, 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_estimate_fingerprint_ignores_item_order_and_zero_counts(catalog, formulas):
+    first = pricing.estimate_fingerprint(catalog, formulas, [('Art', 2), ('Rug', 0), ('Piano', 1)], 40, 1, 0, 3)
+    second = pricing.estimate_fingerprint(catalog, formulas, [('Piano', 1), ('Art', 2)], 40, True, 0, 3)
+    assert first == second
+    catalog.set_item('Art', 10, 'Living Room')
+    assert pricing.estimate_fingerprint(catalog, formulas, [('Art', 2), ('Piano', 1)], 40, True, 0, 3) != first
+
+
+def test_multipliers_of_large_and_negative_hidden_values(formulas):
+    values = numpy.array([2 ** 31 - 1, 5, -3, 30, 5, 0], dtype=numpy.int64)
+    assert formulas.get_multipliers(values).tolist() == [1, 3, 1, 5, 3, 1]
+    assert formulas.get_multipliers(numpy.array([], dtype=numpy.int64)).tolist() == []
+
+
+def test_display_number():
+    assert [pricing.display_number(num) for num in (3.0, 12, 2.675, 0.1 + 0.2, 45.28)] == [3, 12, 2.67, 0.3, 45.28]
+    assert str(pricing.display_number(20.0)) == '20'
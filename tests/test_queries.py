@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+import offline_db
+import queries
+
+
+@pytest.fixture
+def cache():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""CREATE TABLE supplies (id INTEGER PRIMARY KEY AUTOINCREMENT, supply_name TEXT NOT NULL,
+        supplier TEXT, order_price REAL NOT NULL, resell_price REAL NOT NULL)""")
+    yield conn
+    conn.close()
+
+
+SUPPLIES = [(1, 'Small Box', 'Lawrence Paper Company', 1.13, 2.83), (2, 'Tape Roll', 'Uline', 1.0, 2.5)]
+COLUMNS = ('id', 'supply_name', 'supplier', 'order_price', 'resell_price')
+
+
+def test_numbered_placeholders():
+    assert queries.numbered('SELECT * FROM items WHERE item_name = %s AND item_tab = %s') == \
+        'SELECT * FROM items WHERE item_name = $1 AND item_tab = $2'
+    assert queries.numbered('SELECT 1') == 'SELECT 1'
+
+
+def test_execute_rewrites_placeholders_for_sqlite(cache):
+    cache.executemany("INSERT INTO supplies VALUES (?, ?, ?, ?, ?)", SUPPLIES)
+    cursor = queries.execute(cache, 'SELECT supply_name FROM supplies WHERE supplier = %s AND order_price < %s',
+                             ('Uline', 2), 'ignored_on_sqlite')
+    assert cursor.fetchall() == [('Tape Roll',)]
+    assert queries.fetch_all(cache, 'supplies_by_name') == sorted(SUPPLIES, key=lambda row: row[1])
+
+
+class RecordingCursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.calls = []
+        self.prepared = set()
+
+    def cursor(self):
+        return RecordingCursor(self.calls)
+
+
+def test_execute_prepares_named_statements_once():
+    conn = RecordingConnection()
+    queries.execute(conn, 'SELECT * FROM items WHERE item_name = %s', ('Bed',), 'item_by_name')
+    queries.execute(conn, 'SELECT * FROM items WHERE item_name = %s', ('Desk',), 'item_by_name')
+    queries.execute(conn, 'SELECT 1', (), 'one')
+    assert conn.calls == [
+        ('PREPARE item_by_name AS SELECT * FROM items WHERE item_name = $1', None),
+        ('EXECUTE item_by_name (%s)', ('Bed',)),
+        ('EXECUTE item_by_name (%s)', ('Desk',)),
+        ('PREPARE one AS SELECT 1', None),
+        ('EXECUTE one', None),
+    ]
+
+
+def test_execute_runs_unnamed_statements_directly():
+    conn = RecordingConnection()
+    queries.execute(conn, 'DELETE FROM items WHERE item_name = %s', ['Bed'])
+    del conn.prepared
+    queries.execute(conn, 'SELECT 1', (), 'one')
+    assert conn.calls == [('DELETE FROM items WHERE item_name = %s', ['Bed']), ('SELECT 1', None)]
+
+
+def test_bulk_writer_inserts_and_replaces_rows(cache):
+    with offline_db.BulkWriter(cache) as writer:
+        writer.insert('supplies', COLUMNS, SUPPLIES)
+    assert queries.fetch_all(cache, 'supplies') == SUPPLIES
+
+    with offline_db.BulkWriter(cache) as writer:
+        writer.insert('supplies', COLUMNS, [(2, 'Tape Roll', 'Uline', 1.25, 3.0), (3, 'Paper Roll', None, 2.65, 6.63)],
+                      replace=True)
+        writer.delete_ids('supplies', [1])
+    assert queries.fetch_all(cache, 'supplies') == [(2, 'Tape Roll', 'Uline', 1.25, 3.0),
+                                                    (3, 'Paper Roll', None, 2.65, 6.63)]
+
+    with offline_db.BulkWriter(cache) as writer:
+        writer.clear('supplies')
+    assert queries.fetch_all(cache, 'supplies') == []
+
+
+def test_bulk_writer_rolls_back_and_restores_synchronous(tmp_path):
+    conn = offline_db.connect(str(tmp_path / 'offline.db'))
+    conn.execute("CREATE TABLE supplies (id INTEGER PRIMARY KEY, supply_name TEXT NOT NULL)")
+    conn.commit()
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    with pytest.raises(sqlite3.IntegrityError):
+        with offline_db.BulkWriter(conn) as writer:
+            writer.insert('supplies', ('id', 'supply_name'), [(1, 'Small Box')])
+            writer.insert('supplies', ('id', 'supply_name'), [(1, 'Small Box')])
+    assert conn.execute("SELECT count(*) FROM supplies").fetchone() == (0,)
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+    conn.close()
@@ -0,0 +1,50 @@
+from search import NameIndex, words
+
+NAMES = [
+    ('Chest of Drawers', 'Bedroom'),
+    ('Desk (small)', 'Office'),
+    ('Desk (large)', 'Office'),
+    ('Drawer Unit', 'Office'),
+    ('Chair', 'Kitchen'),
+]
+
+
+def test_words_are_casefolded():
+    assert words('Desk (Small)') == ['desk', 'small']
+    assert words('  ') == []
+
+
+def test_search_matches_every_typed_word_as_a_prefix():
+    index = NameIndex(NAMES)
+    assert index.search('ches dra') == {('Chest of Drawers', 'Bedroom')}
+    assert index.search('DRAW') == {('Chest of Drawers', 'Bedroom'), ('Drawer Unit', 'Office')}
+    assert index.search('desk sm') == {('Desk (small)', 'Office')}
+    assert index.search('ch') == {('Chest of Drawers', 'Bedroom'), ('Chair', 'Kitchen')}
+    assert index.search('sofa') == set()
+    assert index.search(' (') is None
+
+
+def test_add_and_remove_keep_the_index_sorted():
+    index = NameIndex(NAMES)
+    index.add('Dresser', 'Bedroom')
+    assert index.search('dr') == {('Chest of Drawers', 'Bedroom'), ('Drawer Unit', 'Office'), ('Dresser', 'Bedroom')}
+    index.remove('Drawer Unit', 'Office')
+    assert index.search('dr') == {('Chest of Drawers', 'Bedroom'), ('Dresser', 'Bedroom')}
+    assert index.keys == sorted(index.keys)
+    assert index.keys == NameIndex(NAMES[:3] + NAMES[4:] + [('Dresser', 'Bedroom')]).keys
+
+
+def test_remove_leaves_other_tabs_and_unknown_names_alone():
+    index = NameIndex(NAMES + [('Chair', 'Office')])
+    index.remove('Chair', 'Kitchen')
+    index.remove('Sofa', 'Living Room')
+    assert index.search('chair') == {('Chair', 'Office')}
+    assert len(index.keys) == len(NameIndex(NAMES + [('Chair', 'Office')]).keys) - 1
+
+
+def test_repeated_words_are_indexed_once():
+    index = NameIndex()
+    index.add('Box Box', 'Garage')
+    assert index.keys == [('box', 'Box Box', 'Garage')]
+    index.remove('Box Box', 'Garage')
+    assert index.keys == []
@@ -0,0 +1,42 @@
+"""Runs database work on a thread pool and posts the results back to the GUI thread through signals."""
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    done = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Calls job(*args) off the GUI thread.
+
+    finished gets the result and failed gets the raised exception, unless the task was cancelled meanwhile; done is
+    emitted either way. A running query can't be interrupted, so cancelling only drops its result.
+    """
+
+    def __init__(self, job, *args):
+        super().__init__()
+        self.job = job
+        self.args = args
+        self.cancelled = False
+        # background upkeep the user didn't ask for is left running by the Cancel button
+        self.cancellable = True
+        # quiet tasks don't show the busy indicator
+        self.quiet = False
+        # signals object is created on the GUI thread, so its slots run there too
+        self.signals = TaskSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            result = self.job(*self.args)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(e)
+        else:
+            if not self.cancelled:
+                self.signals.finished.emit(result)
+        self.signals.done.emit()